@@ -1,26 +1,92 @@
-from flask import Flask, request, jsonify, make_response, redirect, session, url_for, render_template, send_file, send_from_directory
+import time
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, g, request, jsonify, make_response, redirect, session, url_for, render_template
+from database.course_import import FORMATS, parse_courses
 from database.db import Database
+from database.slow_query_log import SlowQueryLog
+from database.pagination import InvalidCursor, parse_limit
+from database_handler import DatabaseHandler
 from auth.email_service import EmailService
 import os
 from datetime import datetime, timedelta
 from auth.oauth_handler import OAuthHandler
+from auth.token_cache import TokenCache, TokenRevoked
+from web.compression import Compression
+from web.file_delivery import FileDelivery
+from web.json_encoding import BACKEND as JSON_BACKEND, FastJSONEncoder, dumps
+from web.metrics import Metrics
+from web.static_assets import StaticAssets
 from functools import wraps
 import jwt
 
-app = Flask(__name__, static_folder='frontend/dist', static_url_path='')
+# The frontend is served by serve() from an in-memory manifest rather than
+# Flask's static route, which would shadow the SPA fallback
+FRONTEND_DIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'dist')
+
+app = Flask(__name__, static_folder=None)
 app.secret_key = os.urandom(24)
+# orjson-backed when installed; JSON_ENCODER=stdlib forces the stdlib encoder
+app.json_encoder = FastJSONEncoder
+metrics = Metrics()
+metrics.init_app(app)
+# Registered after metrics, so its time is part of the measured request
+compression = Compression(min_size=int(os.getenv('COMPRESS_MIN_BYTES', 1024)))
+compression.init_app(app)
+slow_queries = SlowQueryLog(
+    threshold_ms=float(os.getenv('SLOW_QUERY_MS', 100)),
+    max_entries=int(os.getenv('SLOW_QUERY_LOG_SIZE', 200))
+)
+slow_queries.enable()
 db = Database()
+db.init_app(app)
+# Set JWT_SECRET_KEY so admin tokens stay valid across workers and restarts.
+# Revocations go through auth.db so a logout reaches every worker.
+token_cache = TokenCache(
+    os.getenv('JWT_SECRET_KEY') or app.secret_key,
+    max_size=int(os.getenv('TOKEN_CACHE_SIZE', 1024)),
+    revocations=db,
+    check_interval=float(os.getenv('TOKEN_REVOCATION_CHECK_SECONDS', 10))
+)
+hub_db = DatabaseHandler()
 email_service = EmailService()
-oauth_handler = OAuthHandler()
+oauth_handler = OAuthHandler(db)
+static_assets = StaticAssets(FRONTEND_DIST)
+pdf_delivery = FileDelivery(
+    root=os.getenv('COURSE_FILES_ROOT', '.'),
+    offload=os.getenv('FILE_OFFLOAD'),
+    offload_prefix=os.getenv('FILE_OFFLOAD_PREFIX', '/protected/')
+)
+
+# Cold-start timings; databases are only set up by the first query that needs them
+startup = {
+    'import_seconds': None,
+    'first_request_seconds': None,
+}
+
+@app.before_request
+def time_first_request():
+    if startup['first_request_seconds'] is None:
+        g.first_request_started = time.perf_counter()
+
+@app.after_request
+def record_first_request(response):
+    started = g.pop('first_request_started', None)
+    if started is not None and startup['first_request_seconds'] is None:
+        startup['first_request_seconds'] = round(time.perf_counter() - started, 4)
+    return response
 
 # Serve frontend
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    if path != "" and os.path.exists(app.static_folder + '/' + path):
-        return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, 'index.html')
+    asset = static_assets.lookup(path) if path else None
+    if asset is None:
+        # Client-side routes fall back to the SPA entry point
+        asset = static_assets.lookup('index.html')
+    if asset is None:
+        return jsonify({'error': 'Frontend has not been built'}), 404
+    return static_assets.response(asset)
 
 # Admin authentication middleware
 def admin_required(f):
@@ -32,27 +98,86 @@ def admin_required(f):
         
         try:
             token = token.split(' ')[1]  # Remove 'Bearer ' prefix
-            payload = jwt.decode(token, app.secret_key, algorithms=['HS256'])
+            payload = token_cache.verify(token)
             if payload.get('role') != 'admin':
                 return jsonify({'error': 'Admin access required'}), 403
+            g.admin_token = token
+            g.admin_claims = payload
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token has expired'}), 401
+        except TokenRevoked:
+            return jsonify({'error': 'Token has been revoked'}), 401
         except jwt.InvalidTokenError:
             return jsonify({'error': 'Invalid token'}), 401
         
         return f(*args, **kwargs)
     return decorated_function
 
-@app.route('/api/signup', methods=['POST'])
-def signup():
+# Streamed responses are flushed to the client in chunks of about this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def stream_rows(rows, fmt):
+    """Stream an iterable of row dicts as one JSON array or as NDJSON"""
+    ndjson = fmt == 'ndjson'
+
+    def generate():
+        buffer = [] if ndjson else [b'[']
+        size = 0
+        first = True
+        for row in rows:
+            encoded = dumps(row)
+            if ndjson:
+                encoded += b'\n'
+            elif not first:
+                encoded = b',' + encoded
+            first = False
+            buffer.append(encoded)
+            size += len(encoded)
+            if size >= STREAM_CHUNK_BYTES:
+                yield b''.join(buffer)
+                buffer = []
+                size = 0
+        if not ndjson:
+            buffer.append(b']')
+        if buffer:
+            yield b''.join(buffer)
+
+    mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+    return Response(generate(), mimetype=mimetype)
+
+def list_response(get_all, get_page, iter_rows):
+    """Serve an admin listing as a full list, a keyset page, or a stream.
+
+    ?stream=json|ndjson streams every row in constant memory;
+    ?limit=N[&after=cursor] returns one page and the cursor for the next;
+    with neither, the whole list is returned as before.
+    """
+    fmt = request.args.get('stream')
+    if fmt:
+        if fmt not in ('json', 'ndjson'):
+            return jsonify({'error': 'stream must be json or ndjson'}), 400
+        return stream_rows(iter_rows(), fmt)
+
+    if 'limit' in request.args or 'after' in request.args:
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            items, next_cursor = get_page(after=request.args.get('after'), limit=limit)
+        except (InvalidCursor, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'items': items, 'next_cursor': next_cursor}), 200
+
+    return jsonify(get_all()), 200
+
+def create_account():
+    """Create the user from a signup request; returns (error response, verification token)"""
     data = request.get_json()
     
     if not all(k in data for k in ('name', 'email', 'password')):
-        return jsonify({'error': 'Missing required fields'}), 400
+        return (jsonify({'error': 'Missing required fields'}), 400), None
     
     # Check if email already exists
     if db.get_user_by_email(data['email']):
-        return jsonify({'error': 'Email already registered'}), 400
+        return (jsonify({'error': 'Email already registered'}), 400), None
     
     # Create user
     user_id = db.create_user(
@@ -61,11 +186,12 @@ def signup():
         password=data['password']
     )
     if not user_id:
-        return jsonify({'error': 'Failed to create user'}), 500
+        return (jsonify({'error': 'Failed to create user'}), 500), None
     
-    # Create verification token and send email
-    verification_token = db.create_verification_token(user_id)
-    if email_service.send_verification_email(data['email'], verification_token):
+    return None, db.create_verification_token(user_id)
+
+def signup_response(email_sent):
+    if email_sent:
         return jsonify({
             'message': 'Account created successfully. Please check your email to verify your account.'
         }), 201
@@ -74,7 +200,19 @@ def signup():
             'message': 'Account created, but verification email could not be sent. Please contact support.'
         }), 201
 
+@app.route('/api/signup', methods=['POST'])
+def signup():
+    error, verification_token = create_account()
+    if error:
+        return error
+    return signup_response(
+        email_service.send_verification_email(request.get_json()['email'], verification_token)
+    )
+
+limiter = db.rate_limiter
+
 @app.route('/api/login', methods=['POST'])
+@limiter.limit('login', max_attempts=10, window_minutes=15)
 def login():
     data = request.get_json()
     
@@ -121,6 +259,7 @@ def login():
 def logout():
     session_token = request.cookies.get('session_token')
     if session_token:
+        db.invalidate_session(session_token)
         response = make_response(jsonify({'message': 'Logged out successfully'}))
         response.set_cookie('session_token', '', expires=0)
         return response
@@ -254,6 +393,7 @@ def resend_verification():
 
 # Admin login endpoint
 @app.route('/api/admin/login', methods=['POST'])
+@limiter.limit('admin_login', max_attempts=5, window_minutes=15, block_hours=1)
 def admin_login():
     data = request.get_json()
     username = data.get('username')
@@ -267,20 +407,25 @@ def admin_login():
         token = jwt.encode({
             'username': username,
             'role': 'admin',
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)
-        }, app.secret_key)
+            'exp': datetime.utcnow() + timedelta(hours=1)
+        }, token_cache.secret)
         
         return jsonify({'token': token}), 200
     
     return jsonify({'error': 'Invalid credentials'}), 401
 
+@app.route('/api/admin/logout', methods=['POST'])
+@admin_required
+def admin_logout():
+    token_cache.revoke(g.admin_token, g.admin_claims.get('exp'))
+    return jsonify({'message': 'Logged out successfully'}), 200
+
 # User management endpoints
 @app.route('/api/admin/users', methods=['GET'])
 @admin_required
 def get_users():
     try:
-        users = db.get_all_users()
-        return jsonify(users), 200
+        return list_response(db.get_all_users, db.get_users_page, db.iter_users)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -298,8 +443,7 @@ def delete_user(user_id):
 @admin_required
 def get_courses():
     try:
-        courses = db.get_all_courses()
-        return jsonify(courses), 200
+        return list_response(hub_db.get_all_courses, hub_db.get_courses_page, hub_db.iter_courses)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -307,7 +451,7 @@ def get_courses():
 @admin_required
 def delete_course(course_id):
     try:
-        db.delete_course(course_id)
+        hub_db.delete_course(course_id)
         return jsonify({'message': 'Course deleted successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -317,8 +461,7 @@ def delete_course(course_id):
 @admin_required
 def get_blog_posts():
     try:
-        posts = db.get_all_blog_posts()
-        return jsonify(posts), 200
+        return list_response(hub_db.get_all_blog_posts, hub_db.get_blog_posts_page, hub_db.iter_blog_posts)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -326,7 +469,7 @@ def get_blog_posts():
 @admin_required
 def delete_blog_post(post_id):
     try:
-        db.delete_blog_post(post_id)
+        hub_db.delete_blog_post(post_id)
         return jsonify({'message': 'Blog post deleted successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -336,8 +479,7 @@ def delete_blog_post(post_id):
 @admin_required
 def get_services():
     try:
-        services = db.get_all_services()
-        return jsonify(services), 200
+        return list_response(hub_db.get_all_services, hub_db.get_services_page, hub_db.iter_services)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -345,7 +487,7 @@ def get_services():
 @admin_required
 def delete_service(service_id):
     try:
-        db.delete_service(service_id)
+        hub_db.delete_service(service_id)
         return jsonify({'message': 'Service deleted successfully'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -368,7 +510,7 @@ def search_courses():
     query = request.args.get('q', '')
     filter = request.args.get('filter', 'all')
     try:
-        courses = db.search_courses(query, filter)
+        courses = hub_db.search_courses(query, filter)
         return jsonify(courses), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -379,7 +521,7 @@ def search_blog_posts():
     query = request.args.get('q', '')
     filter = request.args.get('filter', 'all')
     try:
-        posts = db.search_blog_posts(query, filter)
+        posts = hub_db.search_blog_posts(query, filter)
         return jsonify(posts), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -390,47 +532,153 @@ def search_services():
     query = request.args.get('q', '')
     filter = request.args.get('filter', 'all')
     try:
-        services = db.search_services(query, filter)
+        services = hub_db.search_services(query, filter)
         return jsonify(services), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Runtime statistics
+@app.route('/api/admin/stats', methods=['GET'])
+@admin_required
+def get_stats():
+    return jsonify({
+        'db_pool': db.pool.stats(),
+        'session_cache': db.session_cache.stats(),
+        'email_queue': email_service.dispatcher.stats(),
+        'rate_limiter': db.rate_limiter.stats(),
+        'catalog_cache': hub_db.catalog_cache.stats(),
+        'janitor': db.janitor.stats(),
+        'oauth_http': oauth_handler.http.stats(),
+        'admin_tokens': token_cache.stats(),
+        'slow_queries': slow_queries.stats(),
+        'compression': dict(compression.stats(), json_encoder=JSON_BACKEND),
+        'startup': dict(
+            startup,
+            auth_db_init_seconds=db.init_seconds,
+            hub_db_init_seconds=hub_db.init_seconds
+        )
+    }), 200
+
+def service_metrics():
+    """Counters the pool, email queue and OAuth client already keep, read at scrape time"""
+    pool = db.pool.stats()
+    email = email_service.dispatcher.stats()
+    oauth = oauth_handler.http.stats()
+    providers = oauth['providers'].items()
+    return [
+        ('db_pool_connections_in_use', 'gauge', 'Auth database connections checked out', [({}, pool['in_use'])]),
+        ('db_pool_waits_total', 'counter', 'Checkouts that had to wait for a connection', [({}, pool['waits'])]),
+        ('email_sent_total', 'counter', 'Emails delivered', [({}, email['sent'])]),
+        ('email_send_seconds_total', 'counter', 'Time spent delivering emails', [({}, email['send_seconds'])]),
+        ('email_queue_wait_seconds_total', 'counter', 'Time delivered emails waited in the queue',
+         [({}, email['wait_seconds'])]),
+        ('email_failed_total', 'counter', 'Emails given up on', [({}, email['failed'])]),
+        ('email_retries_total', 'counter', 'Email delivery retries', [({}, email['retries'])]),
+        ('email_queue_depth', 'gauge', 'Emails waiting to be sent', [({}, email['queue_depth'])]),
+        ('oauth_requests_total', 'counter', 'Calls to OAuth providers',
+         [({'provider': p}, c['requests']) for p, c in providers]),
+        ('oauth_errors_total', 'counter', 'OAuth provider calls that failed or returned 5xx',
+         [({'provider': p}, c['errors']) for p, c in providers]),
+        ('oauth_request_seconds_total', 'counter', 'Time spent calling OAuth providers',
+         [({'provider': p}, c['seconds']) for p, c in providers]),
+        ('oauth_circuit_open', 'gauge', '1 while calls to the provider are short-circuited',
+         [({'provider': p}, int(c['state'] != 'closed')) for p, c in oauth['circuits'].items()]),
+    ]
+
+metrics.add_collector(service_metrics)
+
+@app.route('/api/admin/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    return metrics.response()
+
+@app.route('/api/admin/slow-queries', methods=['GET', 'DELETE'])
+@admin_required
+def get_slow_queries():
+    if request.method == 'DELETE':
+        slow_queries.clear()
+        return jsonify({'message': 'Slow query log cleared'}), 200
+    limit = request.args.get('limit', type=int)
+    return jsonify(dict(slow_queries.stats(), entries=slow_queries.recent(limit))), 200
+
 # Course endpoints
+def cached_json(key, loader):
+    """Serve a pre-encoded catalog response, loading it on a cache miss"""
+    body = hub_db.catalog_cache.get_or_load(key, loader)
+    if body is None:
+        return None
+    return Response(body, mimetype='application/json')
+
+# Most course IDs a single batch request may ask for
+MAX_BATCH_COURSES = 100
+
 @app.route('/api/courses', methods=['GET'])
 def get_all_courses():
     try:
-        courses = db.get_all_courses()
-        return jsonify(courses), 200
+        if request.args.get('include') == 'details':
+            return cached_json(('courses', 'details'), hub_db.get_courses_with_details), 200
+        return cached_json(('courses',), hub_db.get_all_courses), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/courses/batch', methods=['GET'])
+def get_courses_batch():
+    """Fetch many courses with details at once: /api/courses/batch?ids=1,2,3"""
+    try:
+        course_ids = [int(i) for i in request.args.get('ids', '').split(',') if i.strip()]
+    except ValueError:
+        return jsonify({'error': 'ids must be a comma-separated list of integers'}), 400
+    course_ids = list(dict.fromkeys(course_ids))
+    if len(course_ids) > MAX_BATCH_COURSES:
+        return jsonify({'error': f'At most {MAX_BATCH_COURSES} ids per request'}), 400
+
+    try:
+        cache = hub_db.catalog_cache
+        bodies = {}
+        missing = []
+        for course_id in course_ids:
+            body, generation = cache.get(('course', course_id))
+            if body is None:
+                missing.append(course_id)
+            else:
+                bodies[course_id] = body
+        # One query for every course not already cached
+        for course in hub_db.get_courses_with_details(missing):
+            bodies[course['id']] = cache.put(('course', course['id']), course, generation)
+
+        payload = b'[' + b','.join(bodies[i] for i in course_ids if i in bodies) + b']'
+        return Response(payload, mimetype='application/json'), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/courses/<int:course_id>', methods=['GET'])
 def get_course_details(course_id):
+    def load():
+        courses = hub_db.get_courses_with_details([course_id])
+        return courses[0] if courses else None
+
     try:
-        course = db.get_course_by_id(course_id)
-        if not course:
+        response = cached_json(('course', course_id), load)
+        if response is None:
             return jsonify({'error': 'Course not found'}), 404
-        
-        course_details = db.get_course_details(course_id)
-        course['details'] = course_details
-        
-        return jsonify(course), 200
+        return response, 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/courses/<int:course_id>/pdf', methods=['GET'])
 def get_course_pdf(course_id):
     try:
-        course = db.get_course_by_id(course_id)
+        course = hub_db.get_course_by_id(course_id)
         if not course or not course.get('pdf_path'):
             return jsonify({'error': 'PDF not found'}), 404
         
         # In a production environment, you would want to:
         # 1. Check if the user has access to the course
-        # 2. Serve the PDF file securely
-        # 3. Log the download
         
-        return send_file(course['pdf_path'], as_attachment=True)
+        response = pdf_delivery.send(course['pdf_path'], 'application/pdf')
+        if response is None:
+            return jsonify({'error': 'PDF not found'}), 404
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -445,7 +693,7 @@ def create_course():
         if not all(field in data for field in required_fields):
             return jsonify({'error': 'Missing required fields'}), 400
         
-        course_id = db.create_course(
+        course_id = hub_db.create_course(
             title=data['title'],
             level=data['level'],
             instructor=data['instructor'],
@@ -455,7 +703,7 @@ def create_course():
         )
         
         if 'details' in data:
-            db.create_course_details(
+            hub_db.create_course_details(
                 course_id=course_id,
                 description=data['details'].get('description'),
                 learning_objectives=data['details'].get('learning_objectives'),
@@ -467,17 +715,59 @@ def create_course():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Content types accepted by the bulk import endpoint, besides ?format=
+IMPORT_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'application/json-lines': 'jsonl',
+}
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 500))
+
+@app.route('/api/admin/courses/import', methods=['POST'])
+@admin_required
+def import_courses():
+    """Create courses from a streamed CSV or JSONL upload"""
+    fmt = request.args.get('format') or IMPORT_CONTENT_TYPES.get(request.mimetype)
+    if fmt not in FORMATS:
+        return jsonify({'error': f"Upload CSV or JSONL; set Content-Type or ?format={'|'.join(FORMATS)}"}), 415
+    try:
+        # Read the body line by line rather than buffering the whole upload;
+        # parse_courses decodes each line, so a bad one only fails its row
+        result = hub_db.import_courses(parse_courses(request.stream, fmt), chunk_size=IMPORT_CHUNK_SIZE)
+        # A chunk failed after others were committed: report what was created
+        return jsonify(result), 500 if 'error' in result else 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/courses/bulk', methods=['POST'])
+@admin_required
+def bulk_update_courses():
+    """Deactivate or delete many courses: {"action": "deactivate"|"delete", "ids": [...]}"""
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    ids = data.get('ids')
+    if action not in ('deactivate', 'delete'):
+        return jsonify({'error': "action must be 'deactivate' or 'delete'"}), 400
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        return jsonify({'error': 'ids must be a list of integers'}), 400
+    try:
+        result = hub_db.bulk_update_courses(list(dict.fromkeys(ids)), action, chunk_size=IMPORT_CHUNK_SIZE)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/admin/courses/<int:course_id>', methods=['PUT'])
 @admin_required
 def update_course(course_id):
     try:
         data = request.get_json()
-        course = db.get_course_by_id(course_id)
+        course = hub_db.get_course_by_id(course_id)
         
         if not course:
             return jsonify({'error': 'Course not found'}), 404
         
-        db.update_course(
+        hub_db.update_course(
             course_id=course_id,
             title=data.get('title', course['title']),
             level=data.get('level', course['level']),
@@ -488,7 +778,7 @@ def update_course(course_id):
         )
         
         if 'details' in data:
-            db.update_course_details(
+            hub_db.update_course_details(
                 course_id=course_id,
                 description=data['details'].get('description'),
                 learning_objectives=data['details'].get('learning_objectives'),
@@ -500,5 +790,7 @@ def update_course(course_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+startup['import_seconds'] = round(time.perf_counter() - _import_started, 4)
+
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""ASGI entry point: uvicorn asgi:application
+
+Requests that spend most of their time waiting are served on the event
+loop, so one process can hold thousands of them in flight:
+
+- the OAuth callbacks await Google and GitHub through httpx
+- signup answers once its verification email is queued, never waiting
+  on SMTP delivery or its retries
+- catalog and search reads run their usual Flask view on a bounded
+  executor (ASYNC_DB_WORKERS threads, default DB_POOL_SIZE), so a burst
+  waits on the loop rather than in threads blocked on the connection pool
+
+Every other route goes to the WSGI app unchanged through asgiref's
+WsgiToAsgi. The blocking steps of the routes above still run inside a
+Flask request context, so before/after request hooks, metrics and the
+session cookie behave exactly as under a WSGI server.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from werkzeug.exceptions import HTTPException
+
+from app import app, create_account, email_service, metrics, oauth_handler, signup_response
+
+# Request bodies above this size are spooled to disk, as WsgiToAsgi does
+MAX_MEMORY_BODY = 65536
+
+# Routes whose view only does blocking reads; run as-is on the executor
+EXECUTOR_VIEWS = frozenset({
+    'get_all_courses',
+    'get_courses_batch',
+    'get_course_details',
+    'search_users',
+    'search_courses',
+    'search_blog_posts',
+    'search_services',
+})
+
+
+class FlaskCall:
+    """One Flask request context driven across several executor hops.
+
+    Every step runs through run() in the same contextvars Context, so the
+    request, session and g pushed by start() are visible to all of them
+    and the app's hooks see a single request from start to finish.
+    """
+
+    def __init__(self, environ, executor):
+        self.executor = executor
+        self.context = contextvars.copy_context()
+        self.request_context = app.request_context(environ)
+        self.request = self.request_context.request
+        self.pushed = False
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.context.run, func, *args)
+
+    def start(self):
+        """Push the request context and run before_request hooks; returns their response, if any"""
+        self.request_context.push()
+        self.pushed = True
+        app.try_trigger_before_first_request_functions()
+        return app.preprocess_request()
+
+    def finish(self, rv):
+        """Run after_request hooks, save the session; returns (status, headers, body)"""
+        return self._serialize(app.finalize_request(rv))
+
+    def fail(self, error):
+        try:
+            return self.finish(app.handle_user_exception(error))
+        except Exception as e:
+            return self._serialize(app.handle_exception(e))
+
+    def close(self):
+        if self.pushed:
+            self.request_context.pop()
+
+    def dispatch(self):
+        """The whole request in one hop, for views that only do blocking work"""
+        try:
+            try:
+                return self.finish(self.start() or app.dispatch_request())
+            except Exception as e:
+                return self.fail(e)
+        finally:
+            self.close()
+
+    @staticmethod
+    def _serialize(response):
+        try:
+            headers = [(k.encode('latin-1'), v.encode('latin-1')) for k, v in response.headers.to_wsgi_list()]
+            return response.status_code, headers, response.get_data()
+        finally:
+            response.close()
+
+
+async def google_callback(call):
+    code = call.request.args.get('code')
+    if not code:
+        return await call.run(app.dispatch_request)
+    return await oauth_handler.handle_google_callback_async(code, call.run)
+
+
+async def github_callback(call):
+    code = call.request.args.get('code')
+    if not code:
+        return await call.run(app.dispatch_request)
+    return await oauth_handler.handle_github_callback_async(code, call.run)
+
+
+async def signup(call):
+    error, verification_token = await call.run(create_account)
+    if error:
+        return error
+    email_sent = await email_service.send_verification_email_async(
+        call.request.get_json()['email'], verification_token
+    )
+    return await call.run(signup_response, email_sent)
+
+
+ASYNC_VIEWS = {
+    'google_callback': google_callback,
+    'github_callback': github_callback,
+    'signup': signup,
+}
+
+
+def build_environ(scope, body):
+    """The WSGI environ WsgiToAsgi would build, so both paths see the same request"""
+    instance = WsgiToAsgiInstance(app)
+    instance.scope = scope
+    return instance.build_environ(scope, body)
+
+
+async def read_body(receive, body):
+    """Copy the request body into body; returns False if the client went away"""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return False
+        body.write(message.get('body', b''))
+        if not message.get('more_body'):
+            body.seek(0)
+            return True
+
+
+class Application:
+    """ASGI app serving ASYNC_VIEWS and EXECUTOR_VIEWS natively, the rest through WsgiToAsgi"""
+
+    def __init__(self, workers):
+        self.wsgi = WsgiToAsgi(app)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asgi-db')
+        self.urls = app.url_map.bind('localhost')
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.served = 0
+
+    def route(self, scope):
+        """Endpoint name if this request is served natively, else None"""
+        if scope['type'] != 'http':
+            return None
+        path = scope['path'][len(scope.get('root_path', '')):]
+        try:
+            endpoint, _ = self.urls.match(path, method=scope['method'])
+        except HTTPException:
+            return None
+        if endpoint in ASYNC_VIEWS or endpoint in EXECUTOR_VIEWS:
+            return endpoint
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        endpoint = self.route(scope)
+        if endpoint is None:
+            return await self.wsgi(scope, receive, send)
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            with SpooledTemporaryFile(max_size=MAX_MEMORY_BODY) as body:
+                if not await read_body(receive, body):
+                    return
+                call = FlaskCall(build_environ(scope, body), self.executor)
+                if endpoint in EXECUTOR_VIEWS:
+                    status, headers, content = await call.run(call.dispatch)
+                else:
+                    status, headers, content = await self.dispatch_async(call, ASYNC_VIEWS[endpoint])
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.served += 1
+
+        if scope['method'] == 'HEAD':
+            content = b''
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def dispatch_async(self, call, view):
+        try:
+            rv = await call.run(call.start)
+            if rv is None:
+                rv = await view(call)
+            return await call.run(call.finish, rv)
+        except Exception as e:
+            return await call.run(call.fail, e)
+        finally:
+            await call.run(call.close)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await oauth_handler.close_async()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def collect(self):
+        with self._lock:
+            in_flight, served = self.in_flight, self.served
+        return [
+            ('asgi_requests_in_flight', 'gauge', 'Requests being served on the event loop', [({}, in_flight)]),
+            ('asgi_requests_total', 'counter', 'Requests served on the event loop', [({}, served)]),
+        ]
+
+
+application = Application(workers=int(os.getenv('ASYNC_DB_WORKERS', os.getenv('DB_POOL_SIZE', 8))))
+metrics.add_collector(application.collect)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(application, host=os.getenv('HOST', '127.0.0.1'), port=int(os.getenv('PORT', 5000)))
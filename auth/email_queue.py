@@ -0,0 +1,189 @@
+import logging
+import queue
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class EmailQueueFull(Exception):
+    """Raised when the dispatch queue is at capacity"""
+
+
+class EmailDispatcher:
+    """Background SMTP workers that keep authenticated connections open.
+
+    Messages are queued by submit() and sent by a small pool of daemon
+    threads. Each worker holds one SMTP connection (STARTTLS and login done
+    once) and reuses it until it has been idle for ``idle_timeout`` seconds
+    or the server drops it. Transient failures are retried with exponential
+    backoff; 5xx responses are treated as permanent.
+    """
+
+    def __init__(self, host, port, username=None, password=None, use_tls=True,
+                 workers=2, max_queue=1000, max_retries=3, backoff=1.0,
+                 idle_timeout=60, connect_timeout=10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.sent = 0
+        self.send_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.failed = 0
+        self.retries = 0
+        self.connections_opened = 0
+
+    def connect(self):
+        """Open an SMTP connection, upgrading to TLS and logging in if configured"""
+        server = smtplib.SMTP(self.host, self.port, timeout=self.connect_timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return server
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'email-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Let workers finish queued mail, then close their connections"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    def submit(self, msg):
+        """Queue a message for delivery; returns a Future resolving to True"""
+        self.start()
+        future = Future()
+        try:
+            self._queue.put_nowait((msg, future, time.monotonic()))
+        except queue.Full:
+            raise EmailQueueFull('Email queue is full')
+        return future
+
+    def send_now(self, msg):
+        """Send one message synchronously on a fresh connection"""
+        started = time.monotonic()
+        with self.connect() as server:
+            server.send_message(msg)
+        self._record_sent(started)
+
+    def _record_sent(self, started, waited=0.0):
+        """Count a delivered message; started is when its successful attempt began"""
+        with self._lock:
+            elapsed = time.monotonic() - started
+            self.sent += 1
+            self.send_seconds += elapsed
+            self.wait_seconds += waited
+            self._latencies.append(elapsed)
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    @staticmethod
+    def _is_permanent(error):
+        if not isinstance(error, (smtplib.SMTPException, OSError)):
+            # e.g. a malformed message, which fails the same way every time
+            return True
+        code = getattr(error, 'smtp_code', None)
+        return isinstance(error, smtplib.SMTPRecipientsRefused) or (code is not None and 500 <= code < 600)
+
+    def _run(self):
+        server = None
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                # Drop idle connections before the server times them out
+                if server is not None:
+                    self._close(server)
+                    server = None
+                continue
+
+            if item is _STOP:
+                if server is not None:
+                    self._close(server)
+                return
+
+            msg, future, enqueued_at = item
+            waited = time.monotonic() - enqueued_at
+            attempt = 0
+            while True:
+                started = time.monotonic()
+                try:
+                    if server is None:
+                        server = self.connect()
+                    server.send_message(msg)
+                    self._record_sent(started, waited)
+                    future.set_result(True)
+                    break
+                except Exception as e:
+                    # Anything escaping here would kill the worker and leave future pending
+                    if server is not None:
+                        self._close(server)
+                        server = None
+                    attempt += 1
+                    if self._is_permanent(e) or attempt > self.max_retries:
+                        logger.error("Giving up on email to %s: %s", msg['To'], e)
+                        with self._lock:
+                            self.failed += 1
+                        future.set_exception(e)
+                        break
+                    with self._lock:
+                        self.retries += 1
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+            self._queue.task_done()
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'queue_depth': self._queue.qsize(),
+                'workers': len(self._threads),
+                'sent': self.sent,
+                'send_seconds': round(self.send_seconds, 6),
+                'wait_seconds': round(self.wait_seconds, 6),
+                'failed': self.failed,
+                'retries': self.retries,
+                'connections_opened': self.connections_opened,
+            }
+        if latencies:
+            stats['latency_avg_seconds'] = round(sum(latencies) / len(latencies), 6)
+            stats['latency_p95_seconds'] = round(latencies[int(0.95 * (len(latencies) - 1))], 6)
+        return stats
@@ -1,88 +1,125 @@
-import smtplib
+import asyncio
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
 from datetime import datetime, timedelta
 import secrets
 from config.oauth_config import load_dotenv
+from auth.email_queue import EmailDispatcher
 
 load_dotenv()
 
 class EmailService:
-    def __init__(self):
+    def __init__(self, dispatcher=None):
         self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
         self.smtp_port = int(os.getenv('SMTP_PORT', 587))
         self.sender_email = os.getenv('SMTP_USERNAME')
         self.sender_password = os.getenv('SMTP_PASSWORD')
         self.base_url = os.getenv('BASE_URL', 'http://localhost:5000')
+        # Queue mail to background workers instead of sending inside the request
+        self.send_async = os.getenv('EMAIL_ASYNC', 'true').lower() == 'true'
+        self.dispatcher = dispatcher or EmailDispatcher(
+            self.smtp_server,
+            self.smtp_port,
+            username=self.sender_email,
+            password=self.sender_password,
+            use_tls=os.getenv('SMTP_USE_TLS', 'true').lower() == 'true',
+            workers=int(os.getenv('EMAIL_WORKERS', 2)),
+            max_queue=int(os.getenv('EMAIL_QUEUE_SIZE', 1000)),
+            max_retries=int(os.getenv('EMAIL_MAX_RETRIES', 3))
+        )
 
-    def send_verification_email(self, recipient_email, verification_token):
-        try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = recipient_email
-            msg['Subject'] = 'Verify your email - Data Science Hub'
+    def _deliver(self, msg):
+        """Queue msg for the background workers, or send it now if async is off"""
+        if self.send_async:
+            self.dispatcher.submit(msg)
+        else:
+            self.dispatcher.send_now(msg)
+        return True
+
+    async def _deliver_async(self, msg):
+        """_deliver() for the event loop: queuing never waits on SMTP, a direct send runs in a thread"""
+        if self.send_async:
+            self.dispatcher.submit(msg)
+        else:
+            await asyncio.to_thread(self.dispatcher.send_now, msg)
+        return True
 
-            # Create email body
-            verification_link = f"{self.base_url}/verify-email?token={verification_token}"
-            body = f"""
-            <html>
-                <body>
-                    <h2>Welcome to Data Science Hub!</h2>
-                    <p>Thank you for signing up. Please verify your email address by clicking the link below:</p>
-                    <p><a href="{verification_link}">Verify Email Address</a></p>
-                    <p>This link will expire in 24 hours.</p>
-                    <p>If you did not create an account, please ignore this email.</p>
-                    <br>
-                    <p>Best regards,<br>Data Science Hub Team</p>
-                </body>
-            </html>
-            """
+    def _verification_message(self, recipient_email, verification_token):
+        # Create message
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = recipient_email
+        msg['Subject'] = 'Verify your email - Data Science Hub'
 
-            msg.attach(MIMEText(body, 'html'))
+        # Create email body
+        verification_link = f"{self.base_url}/verify-email?token={verification_token}"
+        body = f"""
+        <html>
+            <body>
+                <h2>Welcome to Data Science Hub!</h2>
+                <p>Thank you for signing up. Please verify your email address by clicking the link below:</p>
+                <p><a href="{verification_link}">Verify Email Address</a></p>
+                <p>This link will expire in 24 hours.</p>
+                <p>If you did not create an account, please ignore this email.</p>
+                <br>
+                <p>Best regards,<br>Data Science Hub Team</p>
+            </body>
+        </html>
+        """
 
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+        msg.attach(MIMEText(body, 'html'))
+        return msg
 
-            return True
+    def send_verification_email(self, recipient_email, verification_token):
+        try:
+            return self._deliver(self._verification_message(recipient_email, verification_token))
         except Exception as e:
             print(f"Error sending email: {str(e)}")
             return False
 
-    def send_password_reset_email(self, recipient_email, reset_token):
+    async def send_verification_email_async(self, recipient_email, verification_token):
+        """Returns whether the email was accepted by the queue (or sent, with EMAIL_ASYNC off)"""
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = recipient_email
-            msg['Subject'] = 'Password Reset Request - Data Science Hub'
+            return await self._deliver_async(self._verification_message(recipient_email, verification_token))
+        except Exception as e:
+            print(f"Error sending email: {str(e)}")
+            return False
 
-            reset_link = f"{self.base_url}/reset-password?token={reset_token}"
-            body = f"""
-            <html>
-                <body>
-                    <h2>Password Reset Request</h2>
-                    <p>We received a request to reset your password. Click the link below to proceed:</p>
-                    <p><a href="{reset_link}">Reset Password</a></p>
-                    <p>This link will expire in 1 hour.</p>
-                    <p>If you did not request a password reset, please ignore this email.</p>
-                    <br>
-                    <p>Best regards,<br>Data Science Hub Team</p>
-                </body>
-            </html>
-            """
+    def _password_reset_message(self, recipient_email, reset_token):
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = recipient_email
+        msg['Subject'] = 'Password Reset Request - Data Science Hub'
 
-            msg.attach(MIMEText(body, 'html'))
+        reset_link = f"{self.base_url}/reset-password?token={reset_token}"
+        body = f"""
+        <html>
+            <body>
+                <h2>Password Reset Request</h2>
+                <p>We received a request to reset your password. Click the link below to proceed:</p>
+                <p><a href="{reset_link}">Reset Password</a></p>
+                <p>This link will expire in 1 hour.</p>
+                <p>If you did not request a password reset, please ignore this email.</p>
+                <br>
+                <p>Best regards,<br>Data Science Hub Team</p>
+            </body>
+        </html>
+        """
 
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+        msg.attach(MIMEText(body, 'html'))
+        return msg
 
-            return True
+    def send_password_reset_email(self, recipient_email, reset_token):
+        try:
+            return self._deliver(self._password_reset_message(recipient_email, reset_token))
+        except Exception as e:
+            print(f"Error sending password reset email: {str(e)}")
+            return False
+
+    async def send_password_reset_email_async(self, recipient_email, reset_token):
+        try:
+            return await self._deliver_async(self._password_reset_message(recipient_email, reset_token))
         except Exception as e:
             print(f"Error sending password reset email: {str(e)}")
-            return False 
\ No newline at end of file
+            return False
@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # only needed when serving through asgi.py
+    httpx = None
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a provider after repeated failures.
+
+    After failure_threshold consecutive failures the circuit opens and
+    calls fail immediately. Once reset_timeout seconds have passed one
+    trial call is let through: success closes the circuit, failure opens
+    it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        with self._lock:
+            if self.state == 'closed':
+                return
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                return
+            self.rejected += 1
+            raise CircuitOpenError('Circuit open; provider is failing')
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+            }
+
+
+class HttpClient:
+    """Shared HTTP client for calls to OAuth providers.
+
+    One requests.Session keeps connections alive in a bounded pool, every
+    call gets a (connect, read) timeout, and each provider has its own
+    circuit breaker. Connection errors, timeouts, 5xx responses and any
+    other exception raised during the call count as failures; 4xx
+    responses do not.
+    """
+
+    def __init__(self, pool_size=10, connect_timeout=3.05, read_timeout=10,
+                 failure_threshold=5, reset_timeout=30, workers=4):
+        self.timeout = (connect_timeout, read_timeout)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http-client')
+        self._breakers = {}
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def breaker(self, provider):
+        with self._lock:
+            breaker = self._breakers.get(provider)
+            if breaker is None:
+                breaker = self._breakers[provider] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def request(self, provider, method, url, **kwargs):
+        """Send a request through provider's circuit breaker; raises for error statuses"""
+        breaker = self.breaker(provider)
+        breaker.before_call()
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = self.session.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+        except BaseException:
+            # Any error, cancellation included, must settle a half-open
+            # trial; otherwise the breaker rejects every later call
+            breaker.record_failure()
+            raise
+        finally:
+            self._record(provider, time.perf_counter() - started, failed)
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        response.raise_for_status()
+        return response
+
+    def _record(self, provider, seconds, failed):
+        with self._lock:
+            self.requests += 1
+            calls = self._calls.get(provider)
+            if calls is None:
+                calls = self._calls[provider] = {'requests': 0, 'errors': 0, 'seconds': 0.0}
+            calls['requests'] += 1
+            calls['errors'] += failed
+            calls['seconds'] += seconds
+
+    def get(self, provider, url, **kwargs):
+        return self.request(provider, 'GET', url, **kwargs)
+
+    def post(self, provider, url, **kwargs):
+        return self.request(provider, 'POST', url, **kwargs)
+
+    def get_many(self, provider, urls, **kwargs):
+        """GET independent urls concurrently; returns responses in the same order.
+
+        While provider's circuit is not closed the calls go one after
+        another: the first is the recovery trial, and the rest follow once
+        it has closed the circuit instead of being rejected alongside it.
+        """
+        if self.breaker(provider).state != 'closed':
+            return [self.get(provider, url, **kwargs) for url in urls]
+        futures = [self._executor.submit(self.get, provider, url, **kwargs) for url in urls]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def stats(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+            calls = {provider: dict(c, seconds=round(c['seconds'], 6)) for provider, c in self._calls.items()}
+        return {
+            'requests': self.requests,
+            'timeout_seconds': list(self.timeout),
+            'providers': calls,
+            'circuits': {provider: breaker.stats() for provider, breaker in breakers.items()},
+        }
+
+
+class AsyncHttpClient:
+    """asyncio counterpart of HttpClient, for the ASGI entry point.
+
+    Calls go through the sync client's circuit breakers and are counted in
+    its stats, so a provider that is failing is short-circuited in both
+    serving modes. Waiting on a provider holds no thread; pool_size caps
+    the open connections and further calls queue for one.
+    """
+
+    def __init__(self, http, pool_size=100):
+        if httpx is None:
+            raise RuntimeError('httpx is required for async OAuth calls; pip install httpx')
+        self.http = http
+        connect_timeout, read_timeout = http.timeout
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    async def request(self, provider, method, url, **kwargs):
+        """Send a request through provider's circuit breaker; raises for error statuses"""
+        breaker = self.http.breaker(provider)
+        breaker.before_call()
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            failed = response.status_code >= 500
+        except BaseException:
+            # Any error, cancellation included, must settle a half-open
+            # trial; otherwise the breaker rejects every later call
+            breaker.record_failure()
+            raise
+        finally:
+            self.http._record(provider, time.perf_counter() - started, failed)
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        response.raise_for_status()
+        return response
+
+    async def get(self, provider, url, **kwargs):
+        return await self.request(provider, 'GET', url, **kwargs)
+
+    async def post(self, provider, url, **kwargs):
+        return await self.request(provider, 'POST', url, **kwargs)
+
+    async def get_many(self, provider, urls, **kwargs):
+        """GET independent urls concurrently; returns responses in the same order.
+
+        Sequential while the circuit is not closed, as in HttpClient.get_many.
+        """
+        if self.http.breaker(provider).state != 'closed':
+            return [await self.get(provider, url, **kwargs) for url in urls]
+        return await asyncio.gather(*(self.get(provider, url, **kwargs) for url in urls))
+
+    async def close(self):
+        await self.client.aclose()
@@ -1,11 +1,22 @@
+import os
 import requests
 from flask import redirect, session, url_for, current_app
+from auth.http_client import AsyncHttpClient, CircuitOpenError, HttpClient, httpx
 from config.oauth_config import OAuthConfig
 from database.db import Database
 
 class OAuthHandler:
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db=None, http=None):
+        # Share the app's Database so its pools and caches are not duplicated
+        self.db = db or Database()
+        self.http = http or HttpClient(
+            pool_size=int(os.getenv('OAUTH_HTTP_POOL_SIZE', 10)),
+            connect_timeout=float(os.getenv('OAUTH_CONNECT_TIMEOUT', 3.05)),
+            read_timeout=float(os.getenv('OAUTH_READ_TIMEOUT', 10)),
+            failure_threshold=int(os.getenv('OAUTH_BREAKER_FAILURES', 5)),
+            reset_timeout=float(os.getenv('OAUTH_BREAKER_RESET_SECONDS', 30))
+        )
+        self._async_http = None
         OAuthConfig.validate_config()
 
     def get_google_auth_url(self):
@@ -31,97 +42,145 @@ class OAuthHandler:
         auth_url = f"{OAuthConfig.GITHUB_AUTH_URI}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
         return auth_url
 
+    def _google_token_data(self, code):
+        return {
+            'code': code,
+            'client_id': OAuthConfig.GOOGLE_CLIENT_ID,
+            'client_secret': OAuthConfig.GOOGLE_CLIENT_SECRET,
+            'redirect_uri': OAuthConfig.GOOGLE_REDIRECT_URI,
+            'grant_type': 'authorization_code'
+        }
+
+    def _github_token_data(self, code):
+        return {
+            'client_id': OAuthConfig.GITHUB_CLIENT_ID,
+            'client_secret': OAuthConfig.GITHUB_CLIENT_SECRET,
+            'code': code,
+            'redirect_uri': OAuthConfig.GITHUB_REDIRECT_URI
+        }
+
+    @staticmethod
+    def _google_profile(user_info):
+        return {
+            'email': user_info['email'],
+            'name': user_info.get('name', ''),
+            'provider': 'google',
+            'provider_id': user_info['id']
+        }
+
+    @staticmethod
+    def _github_profile(user_info, emails):
+        primary_email = next((email['email'] for email in emails if email['primary']), None)
+        if not primary_email:
+            raise ValueError("No primary email found for GitHub user")
+        return {
+            'email': primary_email,
+            'name': user_info.get('name', user_info['login']),
+            'provider': 'github',
+            'provider_id': str(user_info['id'])
+        }
+
+    def _login(self, profile):
+        """Create or update the user, start their session and send them to the dashboard"""
+        user = self.db.create_or_update_user(**profile)
+
+        session['user_id'] = user['id']
+        session['email'] = user['email']
+        session['name'] = user['name']
+        session['provider'] = profile['provider']
+
+        return redirect(url_for('dashboard'))
+
+    @staticmethod
+    def _login_failed(provider, error):
+        current_app.logger.error(f"{provider} OAuth error: {str(error)}")
+        return redirect(url_for('login', error='Authentication failed'))
+
     def handle_google_callback(self, code):
         """Handle Google OAuth callback"""
         try:
             # Exchange code for access token
-            token_data = {
-                'code': code,
-                'client_id': OAuthConfig.GOOGLE_CLIENT_ID,
-                'client_secret': OAuthConfig.GOOGLE_CLIENT_SECRET,
-                'redirect_uri': OAuthConfig.GOOGLE_REDIRECT_URI,
-                'grant_type': 'authorization_code'
-            }
-            token_response = requests.post(OAuthConfig.GOOGLE_TOKEN_URI, data=token_data)
-            token_response.raise_for_status()
+            token_response = self.http.post('google', OAuthConfig.GOOGLE_TOKEN_URI, data=self._google_token_data(code))
             access_token = token_response.json()['access_token']
 
             # Get user info
             headers = {'Authorization': f'Bearer {access_token}'}
-            user_response = requests.get(OAuthConfig.GOOGLE_USER_INFO, headers=headers)
-            user_response.raise_for_status()
-            user_info = user_response.json()
-
-            # Create or update user in database
-            user = self.db.create_or_update_user(
-                email=user_info['email'],
-                name=user_info.get('name', ''),
-                provider='google',
-                provider_id=user_info['id']
-            )
-
-            # Set session
-            session['user_id'] = user['id']
-            session['email'] = user['email']
-            session['name'] = user['name']
-            session['provider'] = 'google'
-
-            return redirect(url_for('dashboard'))
-
+            user_info = self.http.get('google', OAuthConfig.GOOGLE_USER_INFO, headers=headers).json()
+            return self._login(self._google_profile(user_info))
         except requests.exceptions.RequestException as e:
-            current_app.logger.error(f"Google OAuth error: {str(e)}")
-            return redirect(url_for('login', error='Authentication failed'))
+            return self._login_failed('Google', e)
 
     def handle_github_callback(self, code):
         """Handle GitHub OAuth callback"""
         try:
             # Exchange code for access token
-            token_data = {
-                'client_id': OAuthConfig.GITHUB_CLIENT_ID,
-                'client_secret': OAuthConfig.GITHUB_CLIENT_SECRET,
-                'code': code,
-                'redirect_uri': OAuthConfig.GITHUB_REDIRECT_URI
-            }
-            headers = {'Accept': 'application/json'}
-            token_response = requests.post(
+            token_response = self.http.post(
+                'github',
                 OAuthConfig.GITHUB_TOKEN_URI,
-                data=token_data,
-                headers=headers
+                data=self._github_token_data(code),
+                headers={'Accept': 'application/json'}
             )
-            token_response.raise_for_status()
             access_token = token_response.json()['access_token']
 
-            # Get user info
+            # Get user info and emails; the two calls are independent
             headers = {'Authorization': f'token {access_token}'}
-            user_response = requests.get(OAuthConfig.GITHUB_USER_INFO, headers=headers)
-            user_response.raise_for_status()
-            user_info = user_response.json()
-
-            # Get user email
-            email_response = requests.get('https://api.github.com/user/emails', headers=headers)
-            email_response.raise_for_status()
-            emails = email_response.json()
-            primary_email = next((email['email'] for email in emails if email['primary']), None)
-
-            if not primary_email:
-                raise ValueError("No primary email found for GitHub user")
-
-            # Create or update user in database
-            user = self.db.create_or_update_user(
-                email=primary_email,
-                name=user_info.get('name', user_info['login']),
-                provider='github',
-                provider_id=str(user_info['id'])
+            user_response, email_response = self.http.get_many(
+                'github',
+                [OAuthConfig.GITHUB_USER_INFO, OAuthConfig.GITHUB_USER_EMAILS],
+                headers=headers
             )
+            return self._login(self._github_profile(user_response.json(), email_response.json()))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return self._login_failed('GitHub', e)
+
+    @property
+    def async_http(self):
+        """AsyncHttpClient sharing self.http's circuit breakers, created on first use"""
+        if self._async_http is None:
+            self._async_http = AsyncHttpClient(
+                self.http, pool_size=int(os.getenv('OAUTH_ASYNC_POOL_SIZE', 100))
+            )
+        return self._async_http
 
-            # Set session
-            session['user_id'] = user['id']
-            session['email'] = user['email']
-            session['name'] = user['name']
-            session['provider'] = 'github'
+    async def close_async(self):
+        if self._async_http is not None:
+            await self._async_http.close()
 
-            return redirect(url_for('dashboard'))
+    async def handle_google_callback_async(self, code, run_sync):
+        """handle_google_callback without holding a thread while Google responds.
 
-        except (requests.exceptions.RequestException, ValueError) as e:
-            current_app.logger.error(f"GitHub OAuth error: {str(e)}")
-            return redirect(url_for('login', error='Authentication failed')) 
\ No newline at end of file
+        run_sync(func, *args) must run blocking code, which needs the request
+        context and the database, off the event loop.
+        """
+        try:
+            token_response = await self.async_http.post(
+                'google', OAuthConfig.GOOGLE_TOKEN_URI, data=self._google_token_data(code)
+            )
+            access_token = token_response.json()['access_token']
+
+            headers = {'Authorization': f'Bearer {access_token}'}
+            user_response = await self.async_http.get('google', OAuthConfig.GOOGLE_USER_INFO, headers=headers)
+            return await run_sync(self._login, self._google_profile(user_response.json()))
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            return await run_sync(self._login_failed, 'Google', e)
+
+    async def handle_github_callback_async(self, code, run_sync):
+        """handle_github_callback without holding a thread while GitHub responds"""
+        try:
+            token_response = await self.async_http.post(
+                'github',
+                OAuthConfig.GITHUB_TOKEN_URI,
+                data=self._github_token_data(code),
+                headers={'Accept': 'application/json'}
+            )
+            access_token = token_response.json()['access_token']
+
+            headers = {'Authorization': f'token {access_token}'}
+            user_response, email_response = await self.async_http.get_many(
+                'github',
+                [OAuthConfig.GITHUB_USER_INFO, OAuthConfig.GITHUB_USER_EMAILS],
+                headers=headers
+            )
+            return await run_sync(self._login, self._github_profile(user_response.json(), email_response.json()))
+        except (httpx.HTTPError, CircuitOpenError, ValueError) as e:
+            return await run_sync(self._login_failed, 'GitHub', e)
@@ -0,0 +1,109 @@
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SCHEME = 'scrypt'
+
+# Default scrypt cost (16 MiB per hash with r=8). Every worker must use the
+# same N, so it is pinned rather than measured at runtime; run
+# `python -m auth.password_hasher [target_ms]` at deploy time to pick a
+# value for this hardware and set it as PASSWORD_HASH_N.
+DEFAULT_N = 2 ** 14
+
+
+def _scrypt(password, salt, n, r, p):
+    # Module level so it can be pickled into worker processes
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * r * (n + p), dklen=32
+    ).hex()
+
+
+def calibrate(target_ms, r=8, p=1, min_n=2 ** 12, max_n=2 ** 20):
+    """Smallest power-of-two scrypt N whose hash takes at least target_ms here"""
+    n = min_n
+    while n < max_n:
+        started = time.perf_counter()
+        _scrypt('calibration', b'0' * 16, n, r, p)
+        if (time.perf_counter() - started) * 1000 >= target_ms:
+            break
+        n *= 2
+    return n
+
+
+class PasswordHasher:
+    """scrypt password hashing run in a bounded process pool.
+
+    KDF work runs outside the request thread so it does not hold the GIL.
+    Hashes are stored as ``scrypt$n$r$p$salt$hash``; the legacy salted
+    SHA-256 ``hash:salt`` format still verifies, and needs_rehash() flags
+    it, and hashes weaker than the current cost, for upgrade on login.
+
+    N comes from PASSWORD_HASH_N (default DEFAULT_N), so every worker
+    hashes at the same cost. With workers=0 hashing runs inline, which is
+    what scripts want.
+    """
+
+    def __init__(self, n=None, r=8, p=1, workers=None):
+        self.n = n or int(os.getenv('PASSWORD_HASH_N', DEFAULT_N))
+        self.r = r
+        self.p = p
+        if workers is None:
+            workers = int(os.getenv('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _run(self, *args):
+        if self.workers <= 0:
+            return _scrypt(*args)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor.submit(_scrypt, *args).result()
+
+    def hash(self, password):
+        salt = secrets.token_hex(16)
+        n, r, p = self.n, self.r, self.p
+        digest = self._run(password, bytes.fromhex(salt), n, r, p)
+        return f'{SCHEME}${n}${r}${p}${salt}${digest}'
+
+    def verify(self, password, stored_hash):
+        if stored_hash.startswith(SCHEME + '$'):
+            try:
+                _, n, r, p, salt, digest = stored_hash.split('$')
+                candidate = self._run(password, bytes.fromhex(salt), int(n), int(r), int(p))
+            except ValueError:
+                return False
+            return hmac.compare_digest(candidate, digest)
+
+        # Legacy format: sha256(password + salt) stored as "hash:salt"
+        digest, _, salt = stored_hash.partition(':')
+        candidate = hashlib.sha256((password + salt).encode()).hexdigest()
+        return hmac.compare_digest(candidate, digest)
+
+    def needs_rehash(self, stored_hash):
+        """True for legacy hashes and scrypt hashes cheaper than the current cost"""
+        if not stored_hash.startswith(SCHEME + '$'):
+            return True
+        _, n, r, p, _, _ = stored_hash.split('$')
+        # Never downgrade: a hash made at a higher cost is left as it is
+        return int(n) < self.n or int(r) < self.r or int(p) < self.p
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+if __name__ == '__main__':
+    # Deploy-time calibration: python -m auth.password_hasher [target_ms]
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print(f'PASSWORD_HASH_N={calibrate(target_ms)}')
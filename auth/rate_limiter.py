@@ -0,0 +1,200 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from functools import wraps
+
+from flask import jsonify, request
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allows bursts of max_attempts, refilling at max_attempts per window"""
+
+    def new_state(self, max_attempts, now):
+        return [float(max_attempts), now]
+
+    def hit(self, state, max_attempts, window_seconds, now):
+        """Consume one token; returns seconds until one is available, 0 if allowed"""
+        rate = max_attempts / window_seconds
+        state[0] = min(float(max_attempts), state[0] + (now - state[1]) * rate)
+        state[1] = now
+        if state[0] >= 1:
+            state[0] -= 1
+            return 0
+        return (1 - state[0]) / rate
+
+
+class SlidingWindow:
+    """Allows at most max_attempts within any trailing window"""
+
+    def new_state(self, max_attempts, now):
+        return deque(maxlen=max_attempts)
+
+    def hit(self, state, max_attempts, window_seconds, now):
+        while state and state[0] <= now - window_seconds:
+            state.popleft()
+        if len(state) < max_attempts:
+            state.append(now)
+            return 0
+        return state[0] + window_seconds - now
+
+
+STRATEGIES = {
+    'token_bucket': TokenBucket,
+    'sliding_window': SlidingWindow,
+}
+
+
+class RateLimiter:
+    """In-process rate limiter keyed by (ip_address, action_type).
+
+    Tracks at most max_keys keys, evicting the least recently used. Once a
+    key runs out of attempts it can optionally be blocked for block_seconds.
+    Blocks can be snapshotted to and restored from the rate_limits table so
+    they survive restarts.
+    """
+
+    def __init__(self, strategy='token_bucket', max_keys=100000):
+        self.strategy = STRATEGIES[strategy]() if isinstance(strategy, str) else strategy
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.denied = 0
+        self.evictions = 0
+
+    def check(self, key, max_attempts, window_seconds, block_seconds=0):
+        """Record one attempt for key; returns (allowed, retry_after_seconds)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {'state': None, 'blocked_until': 0.0}
+                self._evict()
+            else:
+                self._entries.move_to_end(key)
+            if entry['state'] is None:
+                entry['state'] = self.strategy.new_state(max_attempts, now)
+
+            if entry['blocked_until'] > now:
+                self.denied += 1
+                return False, entry['blocked_until'] - now
+
+            retry_after = self.strategy.hit(entry['state'], max_attempts, window_seconds, now)
+            if retry_after == 0:
+                self.allowed += 1
+                return True, 0
+
+            if block_seconds:
+                entry['blocked_until'] = now + block_seconds
+                retry_after = block_seconds
+            self.denied += 1
+            return False, retry_after
+
+    def _evict(self):
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self, ip_address=None, action_type=None):
+        """Forget keys matching the given ip_address and/or action_type"""
+        with self._lock:
+            for key in list(self._entries):
+                if ((ip_address is None or key[0] == ip_address)
+                        and (action_type is None or key[1] == action_type)):
+                    del self._entries[key]
+
+    def limit(self, action_type, max_attempts, window_minutes=60, block_hours=0):
+        """Decorator limiting a Flask route per client IP; answers 429 when exceeded"""
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                allowed, retry_after = self.check(
+                    (request.remote_addr, action_type),
+                    max_attempts, window_minutes * 60, block_hours * 3600
+                )
+                if not allowed:
+                    response = jsonify({'error': 'Too many attempts. Please try again later.'})
+                    response.headers['Retry-After'] = str(int(retry_after) + 1)
+                    return response, 429
+                return f(*args, **kwargs)
+            return decorated_function
+        return decorator
+
+    def snapshot(self, conn):
+        """Persist active blocks to the rate_limits table"""
+        now = time.time()
+        with self._lock:
+            blocked = [
+                (key, entry['blocked_until'])
+                for key, entry in self._entries.items()
+                if entry['blocked_until'] > now
+            ]
+        rows = [
+            (ip_address, action_type, datetime.fromtimestamp(until).strftime('%Y-%m-%d %H:%M:%S'))
+            for (ip_address, action_type), until in blocked
+        ]
+        # Other workers snapshot their own blocks, so only replace ours
+        conn.execute('''
+            DELETE FROM rate_limits
+            WHERE is_blocked = 1 AND block_expires_at <= ?
+        ''', (datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S'),))
+        conn.executemany('''
+            DELETE FROM rate_limits
+            WHERE ip_address = ? AND action_type = ?
+        ''', [row[:2] for row in rows])
+        conn.executemany('''
+            INSERT INTO rate_limits (ip_address, action_type, is_blocked, block_expires_at)
+            VALUES (?, ?, 1, ?)
+        ''', rows)
+        conn.commit()
+        return len(blocked)
+
+    def restore(self, conn):
+        """Load unexpired blocks from the rate_limits table"""
+        rows = conn.execute('''
+            SELECT ip_address, action_type, block_expires_at
+            FROM rate_limits
+            WHERE is_blocked = 1 AND block_expires_at IS NOT NULL
+        ''').fetchall()
+        now = time.time()
+        with self._lock:
+            for ip_address, action_type, expires_at in rows:
+                until = datetime.fromisoformat(expires_at).timestamp()
+                if until > now:
+                    self._entries[(ip_address, action_type)] = {
+                        'state': None,
+                        'blocked_until': until,
+                    }
+            self._evict()
+
+    def start_snapshots(self, connect, interval):
+        """Snapshot blocks every interval seconds from a daemon thread"""
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    conn = connect()
+                    try:
+                        self.snapshot(conn)
+                    finally:
+                        conn.close()
+                except Exception:
+                    # e.g. "database is locked"; try again next interval
+                    logger.exception("Rate limit snapshot failed")
+
+        threading.Thread(target=run, name='rate-limit-snapshots', daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'strategy': type(self.strategy).__name__,
+                'keys': len(self._entries),
+                'max_keys': self.max_keys,
+                'allowed': self.allowed,
+                'denied': self.denied,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,117 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+
+
+class TokenRevoked(jwt.InvalidTokenError):
+    pass
+
+
+class TokenCache:
+    """Verifies JWTs, caching decoded claims until the token's exp.
+
+    Tokens are keyed by their SHA-256 digest, so raw tokens are never held
+    in memory. Only tokens that verify are cached, so garbage cannot push
+    valid entries out of the bounded LRU. Revoked digests are remembered
+    until the token would have expired anyway.
+
+    The cache is per process. With a ``revocations`` store (an object with
+    revoke_token(digest, exp) and is_token_revoked(digest), such as
+    Database) revocations are shared: a token is checked against the store
+    on a cache miss and again once its entry is ``check_interval`` seconds
+    old, so a logout in one worker takes effect in the others within that
+    time. Without a store, revocation is local to the process.
+    """
+
+    def __init__(self, secret, algorithms=('HS256',), max_size=1024, revocations=None, check_interval=10):
+        self.secret = secret
+        self.algorithms = list(algorithms)
+        self.max_size = max_size
+        self.revocations = revocations
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._revoked = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.decode_seconds = 0.0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def verify(self, token):
+        """Return the token's claims; raises jwt.InvalidTokenError like jwt.decode"""
+        key = self.digest(token)
+        now = time.time()
+        with self._lock:
+            if key in self._revoked:
+                raise TokenRevoked('Token has been revoked')
+            entry = self._entries.get(key)
+            if entry is not None:
+                claims, expires, checked_at = entry
+                fresh = self.revocations is None or now - checked_at < self.check_interval
+                if (expires is None or expires > now) and fresh:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return claims
+                del self._entries[key]
+            self.misses += 1
+
+        started = time.perf_counter()
+        try:
+            claims = jwt.decode(token, self.secret, algorithms=self.algorithms)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.decodes += 1
+                self.decode_seconds += elapsed
+
+        if self.revocations is not None and self.revocations.is_token_revoked(key):
+            with self._lock:
+                self._revoked[key] = claims.get('exp')
+            raise TokenRevoked('Token has been revoked')
+
+        with self._lock:
+            self._entries[key] = (claims, claims.get('exp'), now)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return claims
+
+    def revoke(self, token, expires=None):
+        """Reject token from now on; expires is its exp, when known"""
+        key = self.digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if expires is None and entry is not None:
+                expires = entry[1]
+            # Forget revocations for tokens that have expired on their own
+            for revoked, until in list(self._revoked.items()):
+                if until is not None and until <= now:
+                    del self._revoked[revoked]
+            self._revoked[key] = expires
+        if self.revocations is not None:
+            self.revocations.revoke_token(key, expires)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'revoked': len(self._revoked),
+                'decodes': self.decodes,
+                'decode_seconds': round(self.decode_seconds, 6),
+                'avg_decode_us': round(self.decode_seconds / self.decodes * 1e6, 1) if self.decodes else 0.0,
+            }
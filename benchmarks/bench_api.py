@@ -0,0 +1,276 @@
+"""Throughput and latency of the main API endpoints.
+
+Seeds throwaway databases in a temporary directory, then drives the real
+app either in-process through its WSGI interface (--mode wsgi) or over
+HTTP against a threaded local server (--mode http). Prints JSON with
+throughput and p50/p95/p99 latency per endpoint and concurrency level.
+
+Usage: python benchmarks/bench_api.py [--courses 1000] [--users 1000]
+       [--requests 200] [--concurrency 1 4 16] [--mode wsgi http]
+       [--endpoints login courses ...] [--out results.json]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+PASSWORD = 'benchmark-password'
+LEVELS = ('Beginner', 'Intermediate', 'Advanced')
+WORDS = ('python', 'data', 'machine', 'learning', 'statistics', 'pandas', 'sql',
+         'visualization', 'deep', 'neural', 'networks', 'analytics', 'cloud', 'spark')
+
+
+def seed(workdir, users, courses, rng):
+    """Create auth.db and data_science_hub.db under workdir"""
+    from auth.password_hasher import PasswordHasher
+    from database.migrations import AUTH_MIGRATIONS, migrate
+    from database_handler import DatabaseHandler
+
+    os.makedirs(os.path.join(workdir, 'database'))
+    shutil.copy(os.path.join(ROOT, 'database', 'schema.sql'), os.path.join(workdir, 'database'))
+
+    conn = sqlite3.connect(os.path.join(workdir, 'database', 'auth.db'))
+    with open(os.path.join(workdir, 'database', 'schema.sql')) as f:
+        conn.executescript(f.read())
+    migrate(conn, AUTH_MIGRATIONS)
+    # One hash shared by every user; logins still pay the full verify cost
+    password_hash = PasswordHasher(workers=0).hash(PASSWORD)
+    conn.executemany(
+        'INSERT INTO users (name, email, password_hash, is_verified) VALUES (?, ?, ?, 1)',
+        ((f'User {i}', f'user{i}@bench.test', password_hash) for i in range(users))
+    )
+    conn.commit()
+    conn.close()
+
+    handler = DatabaseHandler(os.path.join(workdir, 'data_science_hub.db'))
+    conn = handler.conn
+    start = datetime(2023, 1, 1)
+
+    def title():
+        return ' '.join(rng.choice(WORDS) for _ in range(3)).title()
+
+    conn.executemany(
+        'INSERT INTO courses (title, level, instructor, price, duration, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+        ((title(), rng.choice(LEVELS), f'Instructor {rng.randrange(200)}', rng.randrange(0, 200),
+          f'{rng.randrange(2, 13)} weeks', start + timedelta(minutes=i)) for i in range(courses))
+    )
+    conn.executemany(
+        'INSERT INTO course_details (course_id, description, learning_objectives, prerequisites, syllabus) '
+        'VALUES (?, ?, ?, ?, ?)',
+        ((i, ' '.join(rng.choice(WORDS) for _ in range(40)), 'Objectives', 'None', 'Week 1: intro')
+         for i in range(1, courses + 1))
+    )
+    conn.executemany(
+        'INSERT INTO blog_posts (title, author, content, created_at) VALUES (?, ?, ?, ?)',
+        ((title(), f'Author {rng.randrange(50)}', ' '.join(rng.choice(WORDS) for _ in range(200)),
+          start + timedelta(hours=i)) for i in range(max(1, courses // 5)))
+    )
+    conn.commit()
+    handler.close()
+
+
+def endpoints(users, courses, rng, admin_headers):
+    """name -> function(n) returning (method, path, kwargs) for request n"""
+    return {
+        'login': lambda n: ('POST', '/api/login', {'json': {
+            'email': f'user{rng.randrange(users)}@bench.test', 'password': PASSWORD}}),
+        'signup': lambda n: ('POST', '/api/signup', {'json': {
+            'name': 'New User', 'email': f'new-{n}-{rng.random()}@bench.test', 'password': PASSWORD}}),
+        'courses': lambda n: ('GET', '/api/courses', {}),
+        'course': lambda n: ('GET', f'/api/courses/{rng.randrange(1, courses + 1)}', {}),
+        'admin_search_courses': lambda n: ('GET', f'/api/admin/search/courses?q={rng.choice(WORDS)}',
+                                           {'headers': admin_headers}),
+        'admin_search_blog': lambda n: ('GET', f'/api/admin/search/blog?q={rng.choice(WORDS)}',
+                                        {'headers': admin_headers}),
+    }
+
+
+class ClientAddress:
+    """Takes the client address from X-Bench-Client so per-IP rate limits
+    see many clients rather than one"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        environ['REMOTE_ADDR'] = environ.get('HTTP_X_BENCH_CLIENT', environ.get('REMOTE_ADDR'))
+        return self.app(environ, start_response)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(0, int(round(pct / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def measure(make_sender, build, total, concurrency):
+    """Send total requests from concurrency threads; returns latencies and status counts"""
+    counter = iter(range(total))
+    lock = threading.Lock()
+    latencies = []
+    statuses = Counter()
+
+    def worker():
+        send = make_sender()
+        while True:
+            with lock:
+                n = next(counter, None)
+            if n is None:
+                return
+            method, path, kwargs = build(n)
+            headers = dict(kwargs.pop('headers', {}), **{'X-Bench-Client': f'10.0.{n // 250}.{n % 250}'})
+            started = time.perf_counter()
+            try:
+                status = send(method, path, headers=headers, **kwargs)
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return time.perf_counter() - started, sorted(latencies), statuses
+
+
+def wsgi_sender(app):
+    def make():
+        client = app.test_client()
+
+        def send(method, path, **kwargs):
+            response = client.open(path, method=method, **kwargs)
+            response.close()
+            return response.status_code
+        return send
+    return make
+
+
+def http_sender(base_url):
+    import requests
+
+    def make():
+        session = requests.Session()
+
+        def send(method, path, **kwargs):
+            response = session.request(method, base_url + path, timeout=30, **kwargs)
+            return response.status_code
+        return send
+    return make
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--courses', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--mode', nargs='+', choices=('wsgi', 'http'), default=['wsgi', 'http'])
+    parser.add_argument('--endpoints', nargs='+', help='subset of endpoints to run (default: all)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='bench-api-')
+    cwd = os.getcwd()
+    try:
+        seed_started = time.perf_counter()
+        seed(workdir, args.users, args.courses, rng)
+        seed_seconds = time.perf_counter() - seed_started
+
+        # The app opens its databases relative to the working directory
+        os.chdir(workdir)
+        os.environ.setdefault('SMTP_SERVER', '127.0.0.1')
+        os.environ.setdefault('SMTP_PORT', '9')
+        os.environ.setdefault('EMAIL_MAX_RETRIES', '0')
+        import jwt
+        import app as app_module
+        app = app_module.app
+        app.wsgi_app = ClientAddress(app.wsgi_app)
+
+        token = jwt.encode({'role': 'admin', 'exp': datetime.utcnow() + timedelta(hours=1)},
+                           app_module.token_cache.secret)
+        builders = endpoints(args.users, args.courses, rng, {'Authorization': f'Bearer {token}'})
+        names = args.endpoints or list(builders)
+        unknown = set(names) - set(builders)
+        if unknown:
+            parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+        senders = {}
+        server = None
+        if 'wsgi' in args.mode:
+            senders['wsgi'] = wsgi_sender(app)
+        if 'http' in args.mode:
+            from werkzeug.serving import make_server
+            # Per-request access logging would be part of every measurement
+            logging.getLogger('werkzeug').setLevel(logging.ERROR)
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            senders['http'] = http_sender(f'http://127.0.0.1:{server.server_port}')
+
+        results = []
+        for mode, make_sender in senders.items():
+            for name in names:
+                for concurrency in args.concurrency:
+                    elapsed, latencies, statuses = measure(
+                        make_sender, builders[name], args.requests, concurrency
+                    )
+                    ms = [value * 1000 for value in latencies]
+                    results.append({
+                        'mode': mode,
+                        'endpoint': name,
+                        'concurrency': concurrency,
+                        'requests': len(ms),
+                        'statuses': {str(k): v for k, v in sorted(statuses.items(), key=str)},
+                        'throughput_rps': round(len(ms) / elapsed, 1),
+                        'mean_ms': round(sum(ms) / len(ms), 2),
+                        'p50_ms': round(percentile(ms, 50), 2),
+                        'p95_ms': round(percentile(ms, 95), 2),
+                        'p99_ms': round(percentile(ms, 99), 2),
+                    })
+        if server is not None:
+            server.shutdown()
+
+        report = {
+            'config': {
+                'users': args.users,
+                'courses': args.courses,
+                'requests': args.requests,
+                'seed': args.seed,
+                'seed_seconds': round(seed_seconds, 3),
+                'cpus': os.cpu_count(),
+                'python': sys.version.split()[0],
+                'started_at': datetime.now().isoformat(timespec='seconds'),
+            },
+            'results': results,
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
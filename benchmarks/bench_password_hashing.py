@@ -0,0 +1,46 @@
+"""Password hashing throughput by worker count.
+
+Usage: python benchmarks/bench_password_hashing.py [--hashes 64] [--n 16384]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from auth.password_hasher import PasswordHasher, calibrate
+
+
+def run(workers, hashes, n):
+    hasher = PasswordHasher(n=n, workers=workers)
+    hasher.hash('warm-up')  # start the pool outside the timed section
+    # Enough request threads to keep every worker busy
+    with ThreadPoolExecutor(max_workers=max(1, workers) * 2) as threads:
+        started = time.perf_counter()
+        list(threads.map(hasher.hash, (f'password-{i}' for i in range(hashes))))
+        elapsed = time.perf_counter() - started
+    hasher.shutdown()
+    return {'workers': workers, 'hashes': hashes, 'seconds': round(elapsed, 3),
+            'hashes_per_second': round(hashes / elapsed, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hashes', type=int, default=64)
+    parser.add_argument('--n', type=int, help='scrypt N (default: calibrate to --target-ms)')
+    parser.add_argument('--target-ms', type=float, default=100)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        help='worker counts to try; 0 hashes inline in the calling threads')
+    args = parser.parse_args()
+
+    n = args.n or calibrate(args.target_ms)
+    cpus = os.cpu_count() or 1
+    counts = args.workers or sorted({0, 1, 2, 4, cpus})
+    results = [run(workers, args.hashes, n) for workers in counts]
+    print(json.dumps({'scrypt_n': n, 'cpus': cpus, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
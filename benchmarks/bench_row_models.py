@@ -0,0 +1,107 @@
+"""Memory and time of course rows as __slots__ models versus dicts.
+
+Fills an in-memory database with --rows courses (1M by default), fetches
+them all with each row factory (dict_rows, then the compiled Course
+mapper), and reports the traced memory the result list holds, fetch time,
+and the time to serialize the rows to JSON. Prints JSON.
+
+Usage: python benchmarks/bench_row_models.py [--rows 1000000] [--out results.json]
+"""
+import argparse
+import gc
+import json
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from database.models import Course  # noqa: E402
+from database_handler import COURSE_COLUMNS, dict_rows, model_rows  # noqa: E402
+from web.json_encoding import dumps  # noqa: E402
+
+LEVELS = ('beginner', 'intermediate', 'advanced')
+
+
+def seed(rows):
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE courses (
+            id INTEGER PRIMARY KEY, title TEXT, level TEXT, instructor TEXT, price REAL,
+            duration TEXT, pdf_path TEXT, status TEXT, created_at TEXT
+        )
+    ''')
+    start = datetime(2023, 1, 1)
+    conn.executemany(
+        'INSERT INTO courses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        ((i, f'Course {i}', LEVELS[i % 3], f'Instructor {i % 500}', 49.0 + i % 50,
+          f'{4 + i % 8} weeks', None, 'active',
+          (start + timedelta(seconds=37 * i)).strftime('%Y-%m-%d %H:%M:%S')) for i in range(1, rows + 1))
+    )
+    return conn
+
+
+def measure(conn, factory):
+    """Fetch every course through factory; returns (rows, stats)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    cursor = factory(conn.execute(f"SELECT {', '.join(COURSE_COLUMNS)} FROM courses"))
+    rows = cursor.fetchall()
+    fetch_seconds = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    body = dumps(rows)
+    dumps_seconds = time.perf_counter() - started
+    return rows, {
+        'row_type': type(rows[0]).__name__,
+        'held_mb': round(current / 2 ** 20, 1),
+        'peak_mb': round(peak / 2 ** 20, 1),
+        'bytes_per_row': round(current / len(rows), 1),
+        'container_bytes': sys.getsizeof(rows[0]),
+        'fetch_ms': round(fetch_seconds * 1000, 1),
+        'dumps_ms': round(dumps_seconds * 1000, 1),
+        'json_bytes': len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--out', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    conn = seed(args.rows)
+    results = []
+    for name, factory in (('dict', dict_rows), ('model', lambda cursor: model_rows(cursor, Course))):
+        rows, stats = measure(conn, factory)
+        results.append(dict(stats, factory=name))
+        del rows
+    conn.close()
+
+    dicts, models = results
+    report = {
+        'config': {
+            'rows': args.rows,
+            'python': sys.version.split()[0],
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+        'memory_saved_mb': round(dicts['held_mb'] - models['held_mb'], 1),
+        'memory_ratio': round(models['held_mb'] / dicts['held_mb'], 3),
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Serialization time and bytes on the wire for /api/admin/users.
+
+Seeds a throwaway auth database with --users rows (100k by default),
+then requests the full listing through the app's WSGI interface with each
+JSON backend (stdlib, and orjson if installed) and each Accept-Encoding
+(identity, gzip, and br if brotli is installed). Also times encoding the
+same rows without Flask. Prints JSON.
+
+Usage: python benchmarks/bench_serialization.py [--users 100000]
+       [--repeat 5] [--out results.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from database.migrations import AUTH_MIGRATIONS, migrate
+
+ROLES = ('user', 'user', 'user', 'instructor', 'admin')
+STATUSES = ('active', 'active', 'active', 'suspended')
+PROVIDERS = ('email', 'email', 'google', 'github')
+
+
+def seed(workdir, users, rng):
+    """Create auth.db, migrated as the app expects, holding users rows"""
+    os.makedirs(os.path.join(workdir, 'database'))
+    shutil.copy(os.path.join(ROOT, 'database', 'schema.sql'), os.path.join(workdir, 'database'))
+    conn = sqlite3.connect(os.path.join(workdir, 'database', 'auth.db'))
+    with open(os.path.join(workdir, 'database', 'schema.sql')) as f:
+        conn.executescript(f.read())
+    migrate(conn, AUTH_MIGRATIONS)
+
+    start = datetime(2023, 1, 1)
+    conn.executemany(
+        '''INSERT INTO users (name, email, password_hash, provider, role, status, created_at, last_login)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        ((f'User {i}', f'user{i}@bench.test', 'x', rng.choice(PROVIDERS), rng.choice(ROLES),
+          rng.choice(STATUSES), (start + timedelta(seconds=37 * i)).strftime('%Y-%m-%d %H:%M:%S'),
+          None if i % 3 else (start + timedelta(seconds=41 * i)).strftime('%Y-%m-%d %H:%M:%S'))
+         for i in range(users))
+    )
+    conn.commit()
+    conn.close()
+
+
+def timed(func, repeat):
+    """Run func repeat times; returns (last result, [seconds, ...])"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return result, times
+
+
+def summary(times):
+    ms = [t * 1000 for t in times]
+    return {'mean_ms': round(statistics.mean(ms), 2), 'min_ms': round(min(ms), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per combination')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-serialization-')
+    cwd = os.getcwd()
+    try:
+        seed(workdir, args.users, random.Random(args.seed))
+
+        # The app opens its databases relative to the working directory
+        os.chdir(workdir)
+        import jwt
+        import app as app_module
+        from web import compression, json_encoding
+
+        app = app_module.app
+        token = jwt.encode({'role': 'admin', 'exp': datetime.utcnow() + timedelta(hours=1)},
+                           app_module.token_cache.secret)
+        client = app.test_client()
+        rows = app_module.db.get_all_users()
+
+        backends = ['stdlib'] + (['orjson'] if json_encoding.orjson is not None else [])
+        encodings = ['identity', 'gzip'] + (['br'] if compression.brotli is not None else [])
+
+        encode_results = []
+        http_results = []
+        for backend in backends:
+            json_encoding.BACKEND = backend
+            body, times = timed(lambda: json_encoding.dumps(rows), args.repeat)
+            with app.app_context():
+                _, jsonify_times = timed(lambda: app_module.jsonify(rows).get_data(), args.repeat)
+            encode_results.append({
+                'backend': backend,
+                'bytes': len(body),
+                'dumps': summary(times),
+                'jsonify': summary(jsonify_times),
+            })
+
+            for encoding in encodings:
+                headers = {'Authorization': f'Bearer {token}', 'Accept-Encoding': encoding}
+
+                def request():
+                    response = client.get('/api/admin/users', headers=headers)
+                    response.close()
+                    return response
+
+                client.get('/api/admin/users', headers=headers).close()  # warm the page cache
+                response, times = timed(request, args.repeat)
+                if response.status_code != 200:
+                    raise RuntimeError(f'/api/admin/users returned {response.status_code}: {response.data[:200]!r}')
+                http_results.append({
+                    'backend': backend,
+                    'encoding': response.headers.get('Content-Encoding', 'identity'),
+                    'bytes_on_wire': len(response.data),
+                    'request': summary(times),
+                })
+
+        report = {
+            'config': {
+                'users': args.users,
+                'repeat': args.repeat,
+                'seed': args.seed,
+                'cpus': os.cpu_count(),
+                'python': sys.version.split()[0],
+                'started_at': datetime.now().isoformat(timespec='seconds'),
+            },
+            'encode': encode_results,
+            'requests': http_results,
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
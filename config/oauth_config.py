@@ -5,13 +5,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # OAuth Configuration
+# Provider endpoints can be overridden, e.g. to point at local stub servers
 class OAuthConfig:
     # Google OAuth Configuration
     GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET')
-    GOOGLE_AUTH_URI = 'https://accounts.google.com/o/oauth2/auth'
-    GOOGLE_TOKEN_URI = 'https://oauth2.googleapis.com/token'
-    GOOGLE_USER_INFO = 'https://www.googleapis.com/oauth2/v1/userinfo'
+    GOOGLE_AUTH_URI = os.getenv('GOOGLE_AUTH_URI', 'https://accounts.google.com/o/oauth2/auth')
+    GOOGLE_TOKEN_URI = os.getenv('GOOGLE_TOKEN_URI', 'https://oauth2.googleapis.com/token')
+    GOOGLE_USER_INFO = os.getenv('GOOGLE_USER_INFO', 'https://www.googleapis.com/oauth2/v1/userinfo')
     GOOGLE_REDIRECT_URI = 'http://0.0.0.0:8000/auth/google/callback'
     GOOGLE_SCOPE = [
         'https://www.googleapis.com/auth/userinfo.email',
@@ -21,9 +22,10 @@ class OAuthConfig:
     # GitHub OAuth Configuration
     GITHUB_CLIENT_ID = os.getenv('GITHUB_CLIENT_ID')
     GITHUB_CLIENT_SECRET = os.getenv('GITHUB_CLIENT_SECRET')
-    GITHUB_AUTH_URI = 'https://github.com/login/oauth/authorize'
-    GITHUB_TOKEN_URI = 'https://github.com/login/oauth/access_token'
-    GITHUB_USER_INFO = 'https://api.github.com/user'
+    GITHUB_AUTH_URI = os.getenv('GITHUB_AUTH_URI', 'https://github.com/login/oauth/authorize')
+    GITHUB_TOKEN_URI = os.getenv('GITHUB_TOKEN_URI', 'https://github.com/login/oauth/access_token')
+    GITHUB_USER_INFO = os.getenv('GITHUB_USER_INFO', 'https://api.github.com/user')
+    GITHUB_USER_EMAILS = os.getenv('GITHUB_USER_EMAILS', 'https://api.github.com/user/emails')
     GITHUB_REDIRECT_URI = 'http://0.0.0.0:8000/auth/github/callback'
     GITHUB_SCOPE = ['user:email']
 
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+
+from database.models import json_default
+
+
+class CatalogCache:
+    """Pre-encoded JSON for the public course catalog.
+
+    Keys are tuples: ('courses', ...) for listings and ('course', id, ...)
+    for a single course. Writes through DatabaseHandler call invalidate()
+    with the affected course id, which drops that course's entries and
+    every listing. Invalidation is per process, so entries also expire
+    after ``ttl`` seconds to bound staleness across workers.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return (body, generation); body is None on a miss.
+
+        Pass generation back to put() so a value loaded across a concurrent
+        invalidation is not stored.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                return entry[0], self._generation
+            self.misses += 1
+            return None, self._generation
+
+    def put(self, key, value, generation):
+        """Encode value, store it unless invalidated since generation, and return the body"""
+        body = self.encode(value)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (body, time.monotonic() + self.ttl)
+        return body
+
+    @staticmethod
+    def encode(value):
+        return json.dumps(value, default=json_default, separators=(',', ':')).encode()
+
+    def get_or_load(self, key, loader):
+        """Return the encoded body for key, calling loader() on a miss.
+
+        Returns None (uncached) when loader returns None.
+        """
+        body, generation = self.get(key)
+        if body is not None:
+            return body
+        value = loader()
+        if value is None:
+            return None
+        return self.put(key, value, generation)
+
+    def invalidate(self, course_id=None):
+        """Drop every listing plus course_id's entries, or everything if no id"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if course_id is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if key[0] == 'courses' or (key[0] == 'course' and key[1] == course_id):
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,107 @@
+"""Parse and validate streamed course uploads.
+
+CSV uploads have a header row naming the columns. JSONL uploads have one
+object per line, with details either flat or nested under "details".
+Lines may be bytes, decoded here as UTF-8 (with or without a BOM) so a
+line that isn't valid UTF-8 fails only its own row. Each parsed row is
+yielded as (row_number, values, error): values is a (course, details)
+pair of tuples ready for insertion, or None when the row is invalid and
+error says why.
+"""
+import csv
+import json
+
+COURSE_FIELDS = ('title', 'level', 'instructor', 'price', 'duration', 'pdf_path')
+DETAIL_FIELDS = ('description', 'learning_objectives', 'prerequisites', 'syllabus')
+REQUIRED_FIELDS = ('title', 'level', 'instructor', 'price', 'duration')
+FORMATS = ('csv', 'jsonl')
+
+# Stands in for the record of a line that could not be decoded
+_UNDECODABLE = object()
+
+
+def course_values(record):
+    """Validate one record and return its (course, details) tuples"""
+    if not isinstance(record, dict):
+        raise ValueError('Row must be an object')
+    missing = [f for f in REQUIRED_FIELDS if record.get(f) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+    try:
+        price = float(record['price'])
+    except (TypeError, ValueError):
+        raise ValueError('price must be a number')
+    if price < 0:
+        raise ValueError('price must not be negative')
+
+    details = record.get('details')
+    if not isinstance(details, dict):
+        details = record
+    course = tuple(price if f == 'price' else record.get(f) or None for f in COURSE_FIELDS)
+    detail_values = tuple(details.get(f) or None for f in DETAIL_FIELDS)
+    if not any(detail_values):
+        detail_values = None
+    return course, detail_values
+
+
+def _load_json(line):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise ValueError(f'Invalid JSON: {e}')
+
+
+def _decoded(lines, failures):
+    """Decode byte lines, appending the number of each undecodable one to failures"""
+    for row, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8-sig' if row == 1 else 'utf-8')
+            except UnicodeDecodeError:
+                failures.append(row)
+                line = '\n'
+        yield line
+
+
+def _validated(records, load=None):
+    for row, record in records:
+        try:
+            if record is _UNDECODABLE:
+                raise ValueError('Row must be UTF-8 encoded')
+            if load is not None:
+                record = load(record)
+            yield row, course_values(record), None
+        except ValueError as e:
+            yield row, None, str(e)
+
+
+def _csv_records(lines):
+    # An undecodable line is read as a blank one, which the reader skips;
+    # it is reported in order, before the record that follows it
+    failures = []
+    reader = csv.DictReader(_decoded(lines, failures))
+    for record in reader:
+        while failures:
+            yield failures.pop(0), _UNDECODABLE
+        # Rows are numbered by the line they end on, header included
+        yield reader.line_num, {k.strip(): v for k, v in record.items() if k}
+    for row in failures:
+        yield row, _UNDECODABLE
+
+
+def _jsonl_records(lines):
+    failures = []
+    for row, line in enumerate(_decoded(lines, failures), start=1):
+        if failures:
+            yield failures.pop(), _UNDECODABLE
+        elif line.strip():
+            yield row, line
+
+
+def parse_courses(lines, fmt):
+    """Yield (row_number, values, error) for each row of an upload in fmt"""
+    if fmt == 'csv':
+        return _validated(_csv_records(lines))
+    if fmt == 'jsonl':
+        return _validated(_jsonl_records(lines), load=_load_json)
+    raise ValueError(f"Unsupported format '{fmt}'; use one of: {', '.join(FORMATS)}")
@@ -1,46 +1,118 @@
 import sqlite3
-import hashlib
 import os
 import secrets
+import threading
+import time
 from datetime import datetime, timedelta
+from auth.password_hasher import PasswordHasher
+from auth.rate_limiter import RateLimiter
+from database import tracing
+from database.janitor import Janitor
+from database.migrations import AUTH_MIGRATIONS, migrate, schema_version
+from database.models import Session, User
+from database.pagination import DEFAULT_PAGE_SIZE, encode_cursor, keyset_query
+from database.pool import get_pool
+from database.search_index import build_match_query, has_search_index
+from database.session_cache import SessionCache
+
+# Databases already set up in this process, mapped to the seconds it took
+_initialized = {}
+_init_lock = threading.Lock()
+# Databases mapped to whether they have the users_fts search index
+_users_fts = {}
+
+USER_COLUMNS = ('id', 'email', 'name', 'provider', 'provider_id', 'role', 'status', 'created_at', 'last_login')
+# Columns the admin user listings return; never the password hash
+ADMIN_USER_COLUMNS = ('id', 'name', 'email', 'provider', 'role', 'status', 'created_at', 'last_login')
 
 class Database:
     def __init__(self, db_path='database/auth.db'):
         self.db_path = db_path
-        self.ensure_db_exists()
+        self.pool = get_pool(db_path, max_size=int(os.getenv('DB_POOL_SIZE', 8)))
+        self.hasher = PasswordHasher()
+        self.rate_limiter = RateLimiter(
+            strategy=os.getenv('RATE_LIMIT_STRATEGY', 'token_bucket'),
+            max_keys=int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+        )
+        snapshot_interval = int(os.getenv('RATE_LIMIT_SNAPSHOT_SECONDS', 0))
+        if snapshot_interval:
+            # Persist blocks across restarts
+            conn = self.connect_unpooled()
+            self.rate_limiter.restore(conn)
+            conn.close()
+            self.rate_limiter.start_snapshots(self.connect_unpooled, snapshot_interval)
+        self.session_cache = SessionCache(
+            max_size=int(os.getenv('SESSION_CACHE_SIZE', 10000)),
+            ttl=int(os.getenv('SESSION_CACHE_TTL', 5))
+        )
+        self.janitor = Janitor(
+            self.connect_unpooled,
+            batch_size=int(os.getenv('JANITOR_BATCH_SIZE', 500))
+        )
+        janitor_interval = int(os.getenv('JANITOR_INTERVAL_SECONDS', 0))
+        if janitor_interval:
+            self.janitor.start(janitor_interval)
+
+    def init_app(self, app):
+        """Return request-bound connections to the pool when each request ends"""
+        app.teardown_request(self.pool.teardown_request)
 
     def ensure_db_exists(self):
-        """Ensure database and tables exist"""
-        if not os.path.exists('database'):
-            os.makedirs('database')
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Read and execute schema.sql
-        with open('database/schema.sql', 'r') as f:
-            schema = f.read()
-            cursor.executescript(schema)
-        
-        conn.commit()
-        conn.close()
+        """Ensure database and tables exist, once per process.
+
+        Called on the first query rather than at construction. schema.sql
+        only runs against a database whose schema version shows it has
+        never been set up, so warm starts do a single PRAGMA read.
+        """
+        if self.db_path in _initialized:
+            return
+        with _init_lock:
+            if self.db_path in _initialized:
+                return
+            started = time.perf_counter()
+            if not os.path.exists('database'):
+                os.makedirs('database')
+
+            conn = sqlite3.connect(self.db_path)
+            try:
+                if schema_version(conn) < len(AUTH_MIGRATIONS):
+                    # Only takes effect on a new, empty database
+                    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                    # Read and execute schema.sql
+                    with open('database/schema.sql', 'r') as f:
+                        conn.executescript(f.read())
+                    conn.commit()
+                    migrate(conn, AUTH_MIGRATIONS)
+            finally:
+                conn.close()
+            _initialized[self.db_path] = time.perf_counter() - started
+
+    @property
+    def init_seconds(self):
+        """Time spent setting up this database in this process, None until the first query"""
+        return _initialized.get(self.db_path)
+
+    def connect_unpooled(self):
+        """Dedicated connection for background maintenance threads"""
+        self.ensure_db_exists()
+        return tracing.connect(self.db_path, timeout=30)
 
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+        """Get a pooled database connection"""
+        self.ensure_db_exists()
+        return self.pool.connection()
 
     def hash_password(self, password):
-        """Hash password using SHA-256 with salt"""
-        salt = secrets.token_hex(16)
-        return hashlib.sha256((password + salt).encode()).hexdigest(), salt
+        """Hash password with scrypt in the hashing worker pool"""
+        return self.hasher.hash(password)
 
-    def verify_password(self, password, stored_hash, salt):
+    def verify_password(self, password, stored_hash):
         """Verify password against stored hash"""
-        return hashlib.sha256((password + salt).encode()).hexdigest() == stored_hash
+        return self.hasher.verify(password, stored_hash)
 
     def create_user(self, name, email, password):
         """Create new user"""
-        password_hash, salt = self.hash_password(password)
+        password_hash = self.hash_password(password)
         
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -49,7 +121,7 @@ class Database:
             cursor.execute('''
                 INSERT INTO users (name, email, password_hash)
                 VALUES (?, ?, ?)
-            ''', (name, email, password_hash + ':' + salt))
+            ''', (name, email, password_hash))
             
             conn.commit()
             return True
@@ -75,43 +147,14 @@ class Database:
             return None
         
         user_id, stored_hash = result
-        stored_hash, salt = stored_hash.split(':')
         
-        if self.verify_password(password, stored_hash, salt):
-            return user_id
-        return None
-
-    def create_session(self, user_id):
-        """Create new session for user"""
-        token = secrets.token_hex(32)
-        expires_at = datetime.now() + timedelta(days=7)
-        
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO sessions (user_id, session_token, expires_at)
-            VALUES (?, ?, ?)
-        ''', (user_id, token, expires_at))
-        
-        conn.commit()
-        conn.close()
-        return token
+        if not self.verify_password(password, stored_hash):
+            return None
 
-    def validate_session(self, token):
-        """Validate session token"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT user_id FROM sessions 
-            WHERE session_token = ? AND expires_at > datetime('now')
-        ''', (token,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        return result[0] if result else None
+        # Transparently upgrade legacy or outdated hashes
+        if self.hasher.needs_rehash(stored_hash):
+            self.update_password(user_id, password)
+        return user_id
 
     def record_login_attempt(self, email, ip_address, successful):
         """Record login attempt"""
@@ -167,7 +210,7 @@ class Database:
 
     def update_password(self, user_id, new_password):
         """Update user password"""
-        password_hash, salt = self.hash_password(new_password)
+        password_hash = self.hash_password(new_password)
         
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -176,7 +219,7 @@ class Database:
             UPDATE users 
             SET password_hash = ?
             WHERE id = ?
-        ''', (password_hash + ':' + salt, user_id))
+        ''', (password_hash, user_id))
         
         conn.commit()
         conn.close()
@@ -210,10 +253,12 @@ class Database:
         result = cursor.fetchone()
         
         if not result:
+            conn.close()
             return False
             
         user_id, expires_at = result
         if datetime.now() > datetime.strptime(expires_at, '%Y-%m-%d %H:%M:%S'):
+            conn.close()
             return False
             
         # Mark as verified
@@ -250,83 +295,17 @@ class Database:
 
     def check_rate_limit(self, ip_address, action_type, max_attempts=5, window_minutes=60, block_hours=24):
         """Check if an action is rate limited."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Check for existing block
-        cursor.execute('''
-            SELECT is_blocked, block_expires_at
-            FROM rate_limits
-            WHERE ip_address = ? AND action_type = ? AND is_blocked = 1
-        ''', (ip_address, action_type))
-        result = cursor.fetchone()
-        
-        if result:
-            is_blocked, expires_at = result
-            if datetime.now() < datetime.strptime(expires_at, '%Y-%m-%d %H:%M:%S'):
-                conn.close()
-                return False, f"Too many attempts. Please try again after {expires_at}"
-            else:
-                # Unblock if expired
-                cursor.execute('''
-                    UPDATE rate_limits
-                    SET is_blocked = 0, block_expires_at = NULL
-                    WHERE ip_address = ? AND action_type = ?
-                ''', (ip_address, action_type))
-        
-        # Check attempt count
-        cursor.execute('''
-            SELECT attempt_count, last_attempt
-            FROM rate_limits
-            WHERE ip_address = ? AND action_type = ?
-        ''', (ip_address, action_type))
-        result = cursor.fetchone()
-        
-        if result:
-            count, last_attempt = result
-            time_diff = datetime.now() - datetime.strptime(last_attempt, '%Y-%m-%d %H:%M:%S')
-            
-            if time_diff.total_seconds() < window_minutes * 60:
-                if count >= max_attempts:
-                    # Block the IP
-                    block_expires = datetime.now() + timedelta(hours=block_hours)
-                    cursor.execute('''
-                        UPDATE rate_limits
-                        SET is_blocked = 1, block_expires_at = ?
-                        WHERE ip_address = ? AND action_type = ?
-                    ''', (block_expires, ip_address, action_type))
-                    conn.commit()
-                    conn.close()
-                    return False, f"Too many attempts. IP blocked for {block_hours} hours."
-                
-                # Increment attempt count
-                cursor.execute('''
-                    UPDATE rate_limits
-                    SET attempt_count = attempt_count + 1,
-                        last_attempt = CURRENT_TIMESTAMP
-                    WHERE ip_address = ? AND action_type = ?
-                ''', (ip_address, action_type))
-            else:
-                # Reset attempt count if window expired
-                cursor.execute('''
-                    UPDATE rate_limits
-                    SET attempt_count = 1,
-                        last_attempt = CURRENT_TIMESTAMP
-                    WHERE ip_address = ? AND action_type = ?
-                ''', (ip_address, action_type))
-        else:
-            # Create new rate limit entry
-            cursor.execute('''
-                INSERT INTO rate_limits (ip_address, action_type)
-                VALUES (?, ?)
-            ''', (ip_address, action_type))
-        
-        conn.commit()
-        conn.close()
-        return True, None
+        allowed, retry_after = self.rate_limiter.check(
+            (ip_address, action_type), max_attempts, window_minutes * 60, block_hours * 3600
+        )
+        if allowed:
+            return True, None
+        return False, f"Too many attempts. Please try again in {int(retry_after // 60) + 1} minutes."
 
     def clear_rate_limits(self, ip_address=None, action_type=None):
         """Clear rate limits for an IP or action type."""
+        self.rate_limiter.clear(ip_address, action_type)
+
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -351,9 +330,9 @@ class Database:
 
     def create_or_update_user(self, email, name=None, password=None, provider=None, provider_id=None):
         """Create a new user or update existing user with OAuth provider"""
+        conn = self.get_connection()
         try:
             # Check if user exists with email
-            conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
             user = cursor.fetchone()
@@ -378,58 +357,153 @@ class Database:
                 user_id = cursor.lastrowid
 
             conn.commit()
-            return self.get_user_by_id(user_id)
         except sqlite3.IntegrityError as e:
             conn.rollback()
             raise ValueError("User with this email already exists")
+        finally:
+            conn.close()
+        return self.get_user_by_id(user_id)
 
     def get_user_by_id(self, user_id):
         """Get user by ID"""
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = User.mapper(USER_COLUMNS)
         cursor.execute('''
             SELECT id, email, name, provider, provider_id, role, status, created_at, last_login
             FROM users
             WHERE id = ?
         ''', (user_id,))
         user = cursor.fetchone()
-        if user:
-            return {
-                'id': user[0],
-                'email': user[1],
-                'name': user[2],
-                'provider': user[3],
-                'provider_id': user[4],
-                'role': user[5],
-                'status': user[6],
-                'created_at': user[7],
-                'last_login': user[8]
-            }
-        return None
+        conn.close()
+        return user
 
     def get_user_by_email(self, email):
         """Get user by email"""
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = User.mapper(USER_COLUMNS)
         cursor.execute('''
             SELECT id, email, name, provider, provider_id, role, status, created_at, last_login
             FROM users
             WHERE email = ?
         ''', (email,))
         user = cursor.fetchone()
-        if user:
-            return {
-                'id': user[0],
-                'email': user[1],
-                'name': user[2],
-                'provider': user[3],
-                'provider_id': user[4],
-                'role': user[5],
-                'status': user[6],
-                'created_at': user[7],
-                'last_login': user[8]
-            }
-        return None
+        conn.close()
+        return user
+
+    def _select_users(self, sql, params=()):
+        """All rows of a query over ADMIN_USER_COLUMNS as User models"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = User.mapper(ADMIN_USER_COLUMNS)
+        try:
+            return cursor.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def get_all_users(self):
+        """Every user, newest first"""
+        return self._select_users(f'''
+            SELECT {', '.join(ADMIN_USER_COLUMNS)}
+            FROM users
+            ORDER BY created_at DESC, id DESC
+        ''')
+
+    def get_users_page(self, after=None, limit=DEFAULT_PAGE_SIZE):
+        """One newest-first page of users, plus the cursor for the next page"""
+        sql, params = keyset_query('users', ADMIN_USER_COLUMNS, after=after, limit=limit)
+        rows = self._select_users(sql, params)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        return rows, next_cursor
+
+    def iter_users(self, batch_size=500):
+        """Yield every user, newest first, holding one batch in memory.
+
+        Uses its own connection: a streamed response is still being read
+        after the request's pooled connection has gone back to the pool.
+        """
+        conn = self.connect_unpooled()
+        cursor = conn.cursor()
+        cursor.row_factory = User.mapper(ADMIN_USER_COLUMNS)
+        try:
+            cursor.execute(f'''
+                SELECT {', '.join(ADMIN_USER_COLUMNS)}
+                FROM users
+                ORDER BY created_at DESC, id DESC
+            ''')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def search_users(self, query, filter='all'):
+        """Users matching query by name or email; filter is a status or 'all'.
+
+        Ranked by bm25 through the users_fts index, newest first on ties.
+        Without FTS5 it falls back to a LIKE scan, as content search does.
+        """
+        select = ', '.join(f'u.{c}' for c in ADMIN_USER_COLUMNS)
+        match = build_match_query(query)
+        params = []
+        if match is None:
+            sql = f'SELECT {select} FROM users u WHERE 1 = 1'
+            order = 'u.created_at DESC, u.id DESC'
+        elif self._users_indexed():
+            sql = f'SELECT {select} FROM users_fts JOIN users u ON u.id = users_fts.rowid WHERE users_fts MATCH ?'
+            params.append(match)
+            order = 'bm25(users_fts), u.created_at DESC, u.id DESC'
+        else:
+            sql = f'SELECT {select} FROM users u WHERE (u.name LIKE ? OR u.email LIKE ?)'
+            params.extend([f'%{query}%', f'%{query}%'])
+            order = 'u.created_at DESC, u.id DESC'
+        if filter != 'all':
+            sql += ' AND u.status = ?'
+            params.append(filter)
+        return self._select_users(f'{sql} ORDER BY {order}', params)
+
+    def _users_indexed(self):
+        """Whether migrations could create users_fts here, checked once per process"""
+        if self.db_path not in _users_fts:
+            conn = self.get_connection()
+            try:
+                _users_fts[self.db_path] = has_search_index(conn, 'users')
+            finally:
+                conn.close()
+        return _users_fts[self.db_path]
+
+    def delete_user(self, user_id):
+        """Delete a user and their sessions"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM sessions WHERE user_id = ?', (user_id,))
+        cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
+        conn.commit()
+        conn.close()
+        self.session_cache.invalidate_user(user_id)
+
+    def revoke_token(self, digest, expires=None):
+        """Record a revoked token's digest until its exp (Unix time), for every worker to see"""
+        expires_at = datetime.fromtimestamp(expires).strftime('%Y-%m-%d %H:%M:%S') if expires else None
+        conn = self.get_connection()
+        conn.execute('''
+            INSERT OR REPLACE INTO revoked_tokens (digest, expires_at)
+            VALUES (?, ?)
+        ''', (digest, expires_at))
+        conn.commit()
+        conn.close()
+
+    def is_token_revoked(self, digest):
+        conn = self.get_connection()
+        row = conn.execute('SELECT 1 FROM revoked_tokens WHERE digest = ?', (digest,)).fetchone()
+        conn.close()
+        return row is not None
 
     def create_session(self, user_id):
         """Create a new session for a user"""
@@ -446,12 +520,18 @@ class Database:
         
         conn.commit()
         conn.close()
+        self.session_cache.put(token, user_id, expires_at)
         return token
 
     def validate_session(self, token):
         """Validate a session token"""
+        user_id = self.session_cache.get(token)
+        if user_id is not None:
+            return user_id
+
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = Session.mapper(('user_id', 'expires_at'))
         
         cursor.execute('''
             SELECT user_id, expires_at
@@ -459,8 +539,10 @@ class Database:
             WHERE session_token = ? AND expires_at > CURRENT_TIMESTAMP
         ''', (token,))
         session = cursor.fetchone()
+        conn.close()
         if session:
-            return session[0]  # Return user_id
+            self.session_cache.put(token, session.user_id, datetime.fromisoformat(session.expires_at))
+            return session.user_id
         return None
 
     def invalidate_session(self, token):
@@ -471,6 +553,4 @@ class Database:
         cursor.execute('DELETE FROM sessions WHERE session_token = ?', (token,))
         conn.commit()
         conn.close()
-
-    def __del__(self):
-        self.conn.close()
\ No newline at end of file
+        self.session_cache.invalidate(token)
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""Purge expired rows from the auth database.
+
+Sessions, reset tokens, verification tokens, token revocations, login
+attempts and rate-limit rows are deleted once they are older than their table's retention window.
+Deletes run in small batches, each in its own transaction, so the write
+lock is never held for long. Afterwards free pages are returned to the
+filesystem with incremental_vacuum when the database has
+auto_vacuum=INCREMENTAL (new databases are created that way; convert an
+existing one with ``PRAGMA auto_vacuum = INCREMENTAL; VACUUM;``).
+
+Run one pass from cron with:
+    python -m database.janitor [db_path]
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# table -> (timestamp expression, written in UTC, default retention in hours)
+# Expiry times are written by Python in local time; attempt and
+# rate-limit times come from CURRENT_TIMESTAMP, which is UTC. rate_limits
+# rows have one of each, so last_attempt is converted to local time to
+# compare like with like.
+RULES = {
+    'sessions': ('expires_at', False, 0),
+    'password_reset_tokens': ('expires_at', False, 24),
+    'email_verification': ('expires_at', False, 24),
+    'revoked_tokens': ('expires_at', False, 0),
+    'login_attempts': ('attempt_time', True, 24 * 30),
+    'rate_limits': ("COALESCE(block_expires_at, datetime(last_attempt, 'localtime'))", False, 24),
+}
+
+
+def retention_from_env():
+    """Retention hours per table, overridable with JANITOR_RETENTION_<TABLE>_HOURS"""
+    return {
+        table: float(os.getenv(f'JANITOR_RETENTION_{table.upper()}_HOURS', default))
+        for table, (_, _, default) in RULES.items()
+    }
+
+
+class Janitor:
+    """Deletes expired auth rows in batches and reports what it removed"""
+
+    def __init__(self, connect, retention=None, batch_size=500, pause=0.01, vacuum_pages=2000):
+        self.connect = connect
+        self.retention = retention or retention_from_env()
+        self.batch_size = batch_size
+        self.pause = pause
+        self.vacuum_pages = vacuum_pages
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.rows_removed = 0
+        self.seconds = 0.0
+        self.last_run = None
+
+    def _cutoff(self, table):
+        column, utc, _ = RULES[table]
+        now = datetime.utcnow() if utc else datetime.now()
+        return column, (now - timedelta(hours=self.retention[table])).strftime('%Y-%m-%d %H:%M:%S')
+
+    def purge(self, conn, table):
+        """Delete table's expired rows batch by batch; returns the number deleted"""
+        column, cutoff = self._cutoff(table)
+        removed = 0
+        while True:
+            cursor = conn.execute(f'''
+                DELETE FROM {table} WHERE rowid IN (
+                    SELECT rowid FROM {table} WHERE {column} < ? LIMIT ?
+                )
+            ''', (cutoff, self.batch_size))
+            conn.commit()
+            removed += cursor.rowcount
+            if cursor.rowcount < self.batch_size:
+                return removed
+            # Let waiting writers take the lock between batches
+            time.sleep(self.pause)
+
+    def vacuum(self, conn):
+        """Release free pages if the database uses incremental auto-vacuum; returns pages freed"""
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            return 0
+        before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        # Each step of the pragma frees one page; execute() only steps once,
+        # while executescript() runs it to completion
+        conn.executescript(f'PRAGMA incremental_vacuum({int(self.vacuum_pages)});')
+        return before - conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+    def run_once(self):
+        """Purge every table once and return a report"""
+        with self._lock:
+            started = time.perf_counter()
+            report = {'tables': {}}
+            conn = self.connect()
+            try:
+                for table in RULES:
+                    try:
+                        report['tables'][table] = self.purge(conn, table)
+                    except sqlite3.OperationalError as e:
+                        logger.warning("Janitor skipped %s: %s", table, e)
+                        conn.rollback()
+                report['pages_freed'] = self.vacuum(conn)
+            finally:
+                conn.close()
+
+            report['rows_removed'] = sum(report['tables'].values())
+            report['seconds'] = round(time.perf_counter() - started, 4)
+            report['finished_at'] = datetime.now().isoformat(timespec='seconds')
+            self.runs += 1
+            self.rows_removed += report['rows_removed']
+            self.seconds += report['seconds']
+            self.last_run = report
+            logger.info("Janitor removed %s rows in %.3fs", report['rows_removed'], report['seconds'])
+            return report
+
+    def start(self, interval):
+        """Run every interval seconds from a daemon thread"""
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.run_once()
+                except Exception:
+                    logger.exception("Janitor run failed")
+
+        threading.Thread(target=run, name='db-janitor', daemon=True).start()
+
+    def stats(self):
+        return {
+            'runs': self.runs,
+            'rows_removed': self.rows_removed,
+            'seconds': round(self.seconds, 4),
+            'retention_hours': self.retention,
+            'last_run': self.last_run,
+        }
+
+
+if __name__ == '__main__':
+    import json
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'database/auth.db'
+    if not os.path.exists(db_path):
+        sys.exit(f"{db_path}: not found")
+    janitor = Janitor(lambda: sqlite3.connect(db_path, timeout=30))
+    print(json.dumps(janitor.run_once(), indent=2))
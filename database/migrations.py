@@ -0,0 +1,134 @@
+"""Versioned schema migrations tracked with PRAGMA user_version.
+
+Each database has an ordered list of migration steps. Step N (1-based)
+brings the database to user_version N. Steps only ever get appended;
+never edit or reorder one that has shipped.
+
+Apply pending migrations to both databases with:
+    python -m database.migrations
+"""
+import os
+import sqlite3
+
+from database.search_index import AUTH_SEARCH_INDEXES, create_search_index
+
+
+def _statements(*sql):
+    def step(conn):
+        for statement in sql:
+            conn.execute(statement)
+    return step
+
+
+def _add_missing_columns(table, columns):
+    """Add columns the code relies on but older schemas never created"""
+    def step(conn):
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        for name, definition in columns:
+            if name not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+    return step
+
+
+def _search_indexes(indexes):
+    """FTS5 indexes for admin search; skipped where SQLite lacks FTS5, leaving LIKE scans"""
+    def step(conn):
+        for table, columns in indexes.items():
+            conn.execute('SAVEPOINT search_index')
+            try:
+                create_search_index(conn, table, columns)
+            except sqlite3.OperationalError:
+                conn.execute('ROLLBACK TO search_index')
+            conn.execute('RELEASE search_index')
+    return step
+
+
+AUTH_MIGRATIONS = [
+    # 1: indexes for token, session and login-attempt lookups
+    _statements(
+        'CREATE INDEX IF NOT EXISTS idx_sessions_token ON sessions(session_token)',
+        'CREATE INDEX IF NOT EXISTS idx_email_verification_token ON email_verification(verification_token)',
+        'CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_token ON password_reset_tokens(token)',
+        'CREATE INDEX IF NOT EXISTS idx_login_attempts_email_time ON login_attempts(email, attempt_time)',
+    ),
+    # 2: user columns queried by Database but missing from schema.sql
+    _add_missing_columns('users', [
+        ('password', 'TEXT'),
+        ('provider', 'TEXT'),
+        ('provider_id', 'TEXT'),
+        ('role', "TEXT DEFAULT 'user'"),
+        ('status', "TEXT DEFAULT 'active'"),
+        ('is_verified', 'BOOLEAN DEFAULT 0'),
+    ]),
+    # 3: expiry indexes so the janitor's batched deletes don't scan
+    _statements(
+        'CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)',
+        'CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_expires ON password_reset_tokens(expires_at)',
+        'CREATE INDEX IF NOT EXISTS idx_email_verification_expires ON email_verification(expires_at)',
+        'CREATE INDEX IF NOT EXISTS idx_login_attempts_time ON login_attempts(attempt_time)',
+    ),
+    # 4: keyset pagination of the admin user listing
+    _statements(
+        'CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at, id)',
+    ),
+    # 5: admin token revocations shared by every worker
+    _statements(
+        '''CREATE TABLE IF NOT EXISTS revoked_tokens (
+            digest BLOB PRIMARY KEY,
+            expires_at TIMESTAMP
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens(expires_at)',
+    ),
+    # 6: full-text index on user name and email for admin search
+    _search_indexes(AUTH_SEARCH_INDEXES),
+]
+
+HUB_MIGRATIONS = [
+    # 1: catalog and listing indexes, partial where only active rows are read
+    _statements(
+        'CREATE INDEX IF NOT EXISTS idx_courses_status_created ON courses(status, created_at)',
+        "CREATE INDEX IF NOT EXISTS idx_courses_active_created ON courses(created_at, id) WHERE status = 'active'",
+        'CREATE INDEX IF NOT EXISTS idx_course_details_course ON course_details(course_id)',
+        'CREATE INDEX IF NOT EXISTS idx_blog_posts_created ON blog_posts(created_at, id)',
+        'CREATE INDEX IF NOT EXISTS idx_services_created ON services(created_at, id)',
+    ),
+]
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, migrations):
+    """Apply pending migrations in order, one transaction each.
+
+    Safe to run from several processes at once: each step takes the write
+    lock and re-checks the version before applying. Returns the final
+    schema version.
+    """
+    for target, step in enumerate(migrations, start=1):
+        if schema_version(conn) >= target:
+            continue
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if schema_version(conn) < target:
+                step(conn)
+                conn.execute(f'PRAGMA user_version = {target}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return schema_version(conn)
+
+
+if __name__ == '__main__':
+    for db_path, migrations in (('database/auth.db', AUTH_MIGRATIONS),
+                                ('data_science_hub.db', HUB_MIGRATIONS)):
+        if not os.path.exists(db_path):
+            print(f"{db_path}: not found, skipping")
+            continue
+        conn = sqlite3.connect(db_path)
+        before = schema_version(conn)
+        after = migrate(conn, migrations)
+        conn.close()
+        print(f"{db_path}: schema version {before} -> {after}")
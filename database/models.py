@@ -0,0 +1,153 @@
+"""Compact row models for query results.
+
+Each model is a __slots__ record with one slot per column of its table, so
+a row costs one small object rather than a dict with its own hash table.
+Model.mapper(columns) compiles a sqlite3 row factory for one column order
+that unpacks the row tuple straight into the slots; to_dict() is compiled
+per model the same way. Columns a query does
+not select stay unset and are left out, just as they would be from a dict.
+
+Models support the dict operations callers already use (row['id'],
+row.get(), row['details'] = ..., 'id' in row, keys(), items()) and become
+plain dicts only at the edge: to_dict(), or json_default() in the JSON
+encoders.
+"""
+from datetime import date
+
+from werkzeug.http import http_date
+
+_MISSING = object()
+
+
+def _compile(source, name, **namespace):
+    exec(source, namespace)
+    return namespace[name]
+
+
+class Model:
+    __slots__ = ()
+    fields = ()
+    # Fields that may hold another model, converted by to_dict()
+    nested = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.fields)
+        cls._mappers = {}
+        lines = ['def to_dict(self):', '    """Set fields as a plain dict, nested models included"""', '    result = {}']
+        for name in cls.fields:
+            lines.append(f"    value = getattr(self, '{name}', MISSING)")
+            if name in cls.nested:
+                lines.append(f"    if value is not MISSING: result['{name}'] = "
+                             f"value.to_dict() if isinstance(value, Model) else value")
+            else:
+                lines.append(f"    if value is not MISSING: result['{name}'] = value")
+        lines.append('    return result')
+        cls.to_dict = _compile('\n'.join(lines), 'to_dict', MISSING=_MISSING, Model=Model)
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            self[name] = value
+
+    @classmethod
+    def mapper(cls, columns):
+        """Row factory (cursor, row) -> instance for rows with these columns, compiled once per order"""
+        columns = tuple(columns)
+        mapper = cls._mappers.get(columns)
+        if mapper is None:
+            unknown = [name for name in columns if name not in cls._field_set]
+            if unknown:
+                raise ValueError(f"{cls.__name__} has no field {', '.join(unknown)}")
+            targets = ''.join(f'record.{name}, ' for name in columns)
+            source = (
+                'def map_row(cursor, row):\n'
+                '    record = new(cls)\n'
+                f'    {targets} = row\n'
+                '    return record\n'
+            )
+            mapper = cls._mappers[columns] = _compile(source, 'map_row', new=object.__new__, cls=cls)
+        return mapper
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._field_set:
+            raise KeyError(f"{type(self).__name__} has no field '{key}'")
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._field_set and getattr(self, key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        if key in self._field_set:
+            return getattr(self, key, default)
+        return default
+
+    def keys(self):
+        return [name for name in self.fields if getattr(self, name, _MISSING) is not _MISSING]
+
+    def items(self):
+        return [(name, self[name]) for name in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, (Model, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, Model) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={value!r}' for name, value in self.items())
+        return f'{type(self).__name__}({values})'
+
+
+def json_default(value):
+    """default= hook for JSON encoders: models become dicts, dates HTTP dates as jsonify() writes them.
+
+    Anything else raises TypeError, as json.dumps does, rather than being
+    silently stringified.
+    """
+    if isinstance(value, Model):
+        return value.to_dict()
+    if isinstance(value, date):
+        return http_date(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class User(Model):
+    __slots__ = fields = ('id', 'name', 'email', 'provider', 'provider_id',
+                          'role', 'status', 'created_at', 'last_login')
+
+
+class Session(Model):
+    __slots__ = fields = ('id', 'user_id', 'session_token', 'created_at', 'expires_at')
+
+
+class Course(Model):
+    __slots__ = fields = ('id', 'title', 'level', 'instructor', 'price', 'duration',
+                          'pdf_path', 'status', 'created_at', 'details')
+    nested = ('details',)
+
+
+class CourseDetails(Model):
+    __slots__ = fields = ('id', 'course_id', 'description', 'learning_objectives',
+                          'prerequisites', 'syllabus')
+
+
+class BlogPost(Model):
+    __slots__ = fields = ('id', 'title', 'author', 'content', 'status', 'created_at')
+
+
+class Service(Model):
+    __slots__ = fields = ('id', 'name', 'description', 'price', 'status', 'created_at')
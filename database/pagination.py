@@ -0,0 +1,58 @@
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Raised when an `after` cursor cannot be decoded"""
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor pointing just past the row (created_at, id)"""
+    raw = json.dumps([created_at, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; returns (created_at, id)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor('Invalid pagination cursor')
+    if not isinstance(row_id, int):
+        raise InvalidCursor('Invalid pagination cursor')
+    return created_at, row_id
+
+
+def parse_limit(value):
+    """Clamp a requested page size to [1, MAX_PAGE_SIZE]"""
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_query(table, columns, where=None, after=None, limit=DEFAULT_PAGE_SIZE):
+    """Build a newest-first keyset page query over (created_at, id).
+
+    Fetches one row more than `limit` so the caller can tell whether a
+    next page exists. Returns (sql, params).
+    """
+    conditions = [where] if where else []
+    params = []
+    if after:
+        conditions.append('(created_at, id) < (?, ?)')
+        params.extend(decode_cursor(after))
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    sql += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+    params.append(limit + 1)
+    return sql, params
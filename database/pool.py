@@ -0,0 +1,197 @@
+import queue
+import sqlite3
+import threading
+import time
+
+from flask import g, has_request_context
+
+from database import tracing
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the pool timeout"""
+
+
+class PooledConnection:
+    """Proxy around a sqlite3 connection that returns it to the pool on close()"""
+
+    def __init__(self, pool, conn, request_bound=False):
+        self._pool = pool
+        self._conn = conn
+        self._request_bound = request_bound
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a returned connection.')
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    def close(self):
+        """Return the connection to the pool.
+
+        Connections bound to a Flask request stay checked out until the
+        request is torn down, so closing them early is a no-op.
+        """
+        if self._request_bound or self._conn is None:
+            return
+        self.release()
+
+    def release(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.release(conn)
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared by every thread of the process"""
+
+    def __init__(self, db_path, max_size=8, timeout=10.0, health_check_interval=30.0):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._discarded = 0
+
+    def _connect(self):
+        return tracing.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+
+    def _is_healthy(self, conn, last_used):
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+            self._discarded += 1
+
+    def acquire(self):
+        """Check a raw connection out of the pool, creating one if below max_size"""
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+
+            if conn is None:
+                with self._lock:
+                    can_create = self._created < self.max_size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        conn = self._connect()
+                    except sqlite3.Error:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                    last_used = time.monotonic()
+                else:
+                    started = time.monotonic()
+                    try:
+                        conn, last_used = self._idle.get(timeout=self.timeout)
+                    except queue.Empty:
+                        raise PoolTimeout(
+                            f"No database connection available for {self.db_path} "
+                            f"after {self.timeout}s"
+                        )
+                    finally:
+                        waited = time.monotonic() - started
+                        with self._lock:
+                            self._waits += 1
+                            self._wait_time += waited
+
+            if not self._is_healthy(conn, last_used):
+                self._discard(conn)
+                continue
+
+            with self._lock:
+                self._in_use += 1
+                self._checkouts += 1
+            return conn
+
+    def release(self, conn):
+        """Return a raw connection to the pool, rolling back any open transaction"""
+        with self._lock:
+            self._in_use -= 1
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    def connection(self):
+        """Get a pooled connection, reusing the current request's one if any"""
+        if has_request_context():
+            key = f'_db_conn:{self.db_path}'
+            conn = g.get(key)
+            if conn is None:
+                conn = PooledConnection(self, self.acquire(), request_bound=True)
+                setattr(g, key, conn)
+            return conn
+        return PooledConnection(self, self.acquire())
+
+    def teardown_request(self, exc=None):
+        """Return the connection checked out by the current request, if any"""
+        conn = g.pop(f'_db_conn:{self.db_path}', None)
+        if conn is not None:
+            conn.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'db_path': self.db_path,
+                'max_size': self.max_size,
+                'size': self._created,
+                'in_use': self._in_use,
+                'idle': self._idle.qsize(),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time_seconds': round(self._wait_time, 6),
+                'discarded': self._discarded,
+            }
+
+    def close_all(self):
+        """Close every idle connection; checked-out connections close on release"""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, **kwargs):
+    """Return the process-wide pool for db_path, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = ConnectionPool(db_path, **kwargs)
+        return pool
@@ -1,16 +1,82 @@
+import argparse
+import itertools
+import math
+import random
 import sqlite3
 import os
-import hashlib
-import secrets
+import sys
+import time
 from datetime import datetime, timedelta
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from auth.password_hasher import PasswordHasher
+from database.migrations import AUTH_MIGRATIONS, HUB_MIGRATIONS, migrate
+from database.search_index import ensure_search_indexes
+
+HUB_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS courses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        level TEXT NOT NULL,
+        instructor TEXT NOT NULL,
+        price REAL NOT NULL,
+        duration TEXT NOT NULL,
+        pdf_path TEXT,
+        status TEXT DEFAULT 'active',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS course_details (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_id INTEGER NOT NULL,
+        description TEXT,
+        learning_objectives TEXT,
+        prerequisites TEXT,
+        syllabus TEXT,
+        FOREIGN KEY (course_id) REFERENCES courses(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS admin_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        admin_id INTEGER,
+        action TEXT,
+        target_type TEXT,
+        target_id INTEGER,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS blog_posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        author TEXT NOT NULL,
+        content TEXT NOT NULL,
+        status TEXT DEFAULT 'active',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS services (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT NOT NULL,
+        price REAL NOT NULL,
+        status TEXT DEFAULT 'active',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+'''
+
+DB_FILES = ['database/auth.db', 'data_science_hub.db']
+
+def remove_databases():
+    # A leftover -wal file would be replayed into the new database
+    for db_file in DB_FILES:
+        for path in (db_file, db_file + '-wal', db_file + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"Removed {path}")
+
 def reset_database():
     # Remove existing database files
-    db_files = ['database/auth.db', 'data_science_hub.db']
-    for db_file in db_files:
-        if os.path.exists(db_file):
-            os.remove(db_file)
-            print(f"Removed {db_file}")
+    remove_databases()
 
     # Create database directory if it doesn't exist
     if not os.path.exists('database'):
@@ -19,33 +85,34 @@ def reset_database():
     # Initialize auth database
     conn = sqlite3.connect('database/auth.db')
     cursor = conn.cursor()
+    # Lets the janitor hand freed pages back with incremental_vacuum
+    cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
 
     # Read and execute schema.sql
     with open('database/schema.sql', 'r') as f:
         schema = f.read()
         cursor.executescript(schema)
 
+    hasher = PasswordHasher(workers=0)
+
     # Create default admin user
     password = "admin123"  # Default password
-    salt = secrets.token_hex(16)
-    password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
     
     cursor.execute('''
         INSERT INTO users (name, email, password_hash, is_active)
         VALUES (?, ?, ?, ?)
-    ''', ('Admin User', 'admin@example.com', password_hash + ':' + salt, 1))
+    ''', ('Admin User', 'admin@example.com', hasher.hash(password), 1))
 
     # Create default student user
     password = "student123"  # Default password
-    salt = secrets.token_hex(16)
-    password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
     
     cursor.execute('''
         INSERT INTO users (name, email, password_hash, is_active)
         VALUES (?, ?, ?, ?)
-    ''', ('Student User', 'student@example.com', password_hash + ':' + salt, 1))
+    ''', ('Student User', 'student@example.com', hasher.hash(password), 1))
 
     conn.commit()
+    migrate(conn, AUTH_MIGRATIONS)
     conn.close()
 
     # Initialize main database
@@ -53,56 +120,7 @@ def reset_database():
     cursor = conn.cursor()
 
     # Create tables
-    cursor.executescript('''
-        CREATE TABLE IF NOT EXISTS courses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            level TEXT NOT NULL,
-            instructor TEXT NOT NULL,
-            price REAL NOT NULL,
-            duration TEXT NOT NULL,
-            pdf_path TEXT,
-            status TEXT DEFAULT 'active',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        CREATE TABLE IF NOT EXISTS course_details (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            course_id INTEGER NOT NULL,
-            description TEXT,
-            learning_objectives TEXT,
-            prerequisites TEXT,
-            syllabus TEXT,
-            FOREIGN KEY (course_id) REFERENCES courses(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS admin_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            admin_id INTEGER,
-            action TEXT,
-            target_type TEXT,
-            target_id INTEGER,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        CREATE TABLE IF NOT EXISTS blog_posts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            author TEXT NOT NULL,
-            content TEXT NOT NULL,
-            status TEXT DEFAULT 'active',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        CREATE TABLE IF NOT EXISTS services (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            description TEXT NOT NULL,
-            price REAL NOT NULL,
-            status TEXT DEFAULT 'active',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-    ''')
+    cursor.executescript(HUB_SCHEMA)
 
     # Insert sample courses
     sample_courses = [
@@ -153,6 +171,7 @@ def reset_database():
     ''', services)
 
     conn.commit()
+    migrate(conn, HUB_MIGRATIONS)
     conn.close()
 
     print("Database reset completed successfully!")
@@ -160,5 +179,270 @@ def reset_database():
     print("Admin - Email: admin@example.com, Password: admin123")
     print("Student - Email: student@example.com, Password: student123")
 
+# Default row counts for --generate, about 10M rows in total at --scale 1
+GENERATE_COUNTS = {
+    'users': 1000000,
+    'sessions': 2000000,
+    'login_attempts': 6000000,
+    'courses': 100000,
+    'blog_posts': 200000,
+    'services': 5000,
+}
+GENERATED_PASSWORD = 'generated123'
+# Spread over the last two years, denser towards the present
+HISTORY_SECONDS = 2 * 365 * 24 * 3600
+
+WORDS = (
+    'data', 'science', 'python', 'machine', 'learning', 'deep', 'neural', 'networks',
+    'statistics', 'probability', 'pandas', 'numpy', 'sql', 'analytics', 'visualization',
+    'regression', 'classification', 'clustering', 'spark', 'cloud', 'engineering',
+    'pipelines', 'modeling', 'forecasting', 'nlp', 'vision', 'bayesian', 'inference',
+    'optimization', 'dashboards', 'experimentation', 'causal', 'time', 'series',
+)
+FIRST_NAMES = ('Amina', 'Brian', 'Chen', 'Daniela', 'Enoch', 'Fatima', 'George', 'Hana', 'Ivan',
+               'Joy', 'Kofi', 'Lena', 'Mateo', 'Nia', 'Omar', 'Priya', 'Quinn', 'Rosa', 'Sam', 'Wanjiru')
+LAST_NAMES = ('Achieng', 'Brown', 'Chen', 'Diaz', 'Evans', 'Fischer', 'Garcia', 'Hussein', 'Ito',
+              'Kamau', 'Lopez', 'Mwangi', 'Nguyen', 'Otieno', 'Patel', 'Rossi', 'Smith', 'Wafula')
+DOMAINS = ('gmail.com', 'yahoo.com', 'outlook.com', 'example.org', 'university.edu', 'company.co.ke')
+LEVELS = ('Beginner', 'Intermediate', 'Advanced')
+LEVEL_WEIGHTS = (50, 35, 15)
+
+# Bulk-load settings; a failed load leaves databases that should be regenerated
+BULK_PRAGMAS = (
+    'PRAGMA journal_mode = OFF',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA cache_size = -262144',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA locking_mode = EXCLUSIVE',
+)
+
+
+class Generator:
+    """Reproducible synthetic rows with skewed, production-like distributions"""
+
+    def __init__(self, seed, now=None):
+        self.rng = random.Random(seed)
+        self.now = int((now or datetime.now()).timestamp())
+        # Emails of the generated users, in id order, for login attempts to target
+        self.user_emails = []
+
+    def timestamp(self):
+        # sqrt skews towards recent times, like a growing user base
+        return self.now - int(HISTORY_SECONDS * (1 - math.sqrt(self.rng.random())))
+
+    def popular(self, n):
+        """1..n, with low numbers far more likely (a few heavy users, instructors, authors)"""
+        return min(n, int(n * self.rng.random() ** 3) + 1)
+
+    def words(self, count):
+        return ' '.join(self.rng.choices(WORDS, k=count))
+
+    def person(self):
+        return f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+
+    def users(self, count, password_hash):
+        for i in range(1, count + 1):
+            name = self.person()
+            email = f"{name.lower().replace(' ', '.')}.{i}@{self.rng.choice(DOMAINS)}"
+            self.user_emails.append(email)
+            created = self.timestamp()
+            last_login = None
+            if self.rng.random() < 0.8:
+                last_login = created + int((self.now - created) * self.rng.random())
+            yield (name, email, password_hash, created, last_login, int(self.rng.random() < 0.97))
+
+    def sessions(self, count, users):
+        for _ in range(count):
+            created = self.timestamp()
+            yield (self.popular(users), '%032x' % self.rng.getrandbits(128), created, created + 7 * 24 * 3600)
+
+    def login_attempts(self, count):
+        """Attempts against the generated users' emails; call after users() has run"""
+        randrange = self.rng.randrange
+        emails = self.user_emails
+        users = len(emails)
+        for _ in range(count):
+            ip = randrange(1 << 24, 224 << 24)
+            ip_address = f'{ip >> 24}.{ip >> 16 & 255}.{ip >> 8 & 255}.{ip & 255}'
+            if users and self.rng.random() < 0.95:
+                email = emails[self.popular(users) - 1]
+                successful = int(self.rng.random() < 0.85)
+            else:
+                # Credential stuffing against addresses that don't exist
+                email = f'unknown{randrange(max(1, users) * 10)}@{self.rng.choice(DOMAINS)}'
+                successful = 0
+            yield (email, ip_address, self.timestamp(), successful)
+
+    def courses(self, count):
+        instructors = max(1, count // 50)
+        for _ in range(count):
+            price = round(min(999.0, self.rng.lognormvariate(4.5, 0.6))) - 0.01
+            yield (
+                self.words(self.rng.randint(2, 5)).title(),
+                self.rng.choices(LEVELS, LEVEL_WEIGHTS)[0],
+                f'Dr. {self.person()} #{self.popular(instructors)}',
+                max(0.0, price),
+                f'{self.rng.randint(2, 16)} weeks',
+                'active' if self.rng.random() < 0.9 else 'inactive',
+                self.timestamp(),
+            )
+
+    def course_details(self, count):
+        for course_id in range(1, count + 1):
+            yield (
+                course_id,
+                self.words(max(5, int(self.rng.gauss(60, 20)))),
+                self.words(12),
+                self.words(4),
+                '; '.join(f'Week {week}: {self.words(3)}' for week in range(1, self.rng.randint(3, 12))),
+            )
+
+    def blog_posts(self, count):
+        authors = max(1, count // 100)
+        for _ in range(count):
+            yield (
+                self.words(self.rng.randint(3, 8)).title(),
+                f'{self.person()} #{self.popular(authors)}',
+                self.words(max(20, int(self.rng.gauss(400, 150)))),
+                'active' if self.rng.random() < 0.95 else 'inactive',
+                self.timestamp(),
+            )
+
+    def services(self, count):
+        for _ in range(count):
+            yield (
+                self.words(self.rng.randint(2, 4)).title(),
+                self.words(self.rng.randint(10, 40)),
+                round(self.rng.uniform(99, 4999)) - 0.01,
+                'active' if self.rng.random() < 0.9 else 'inactive',
+                self.timestamp(),
+            )
+
+
+def load(conn, table, sql, rows, chunk_size):
+    """Insert rows with executemany in chunks inside one transaction; returns the row count"""
+    started = time.perf_counter()
+    count = 0
+    conn.execute('BEGIN')
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        conn.executemany(sql, chunk)
+        count += len(chunk)
+    conn.execute('COMMIT')
+    elapsed = time.perf_counter() - started
+    print(f"{table}: {count:,} rows in {elapsed:.1f}s ({count / elapsed if elapsed else 0:,.0f} rows/s)")
+    return count
+
+
+def bulk_connect(path):
+    conn = sqlite3.connect(path, isolation_level=None)
+    for pragma in BULK_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def finish(conn, migrations, journal_mode):
+    """Build the deferred indexes, then restore durable settings; returns seconds taken"""
+    started = time.perf_counter()
+    conn.isolation_level = ''
+    migrate(conn, migrations)
+    conn.execute('ANALYZE')
+    conn.commit()
+    conn.execute('PRAGMA synchronous = FULL')
+    conn.execute('PRAGMA locking_mode = NORMAL')
+    conn.execute(f'PRAGMA journal_mode = {journal_mode}')
+    return time.perf_counter() - started
+
+
+def generate_database(counts, seed=42, chunk_size=10000):
+    """Replace both databases with synthetic data of the given sizes.
+
+    Rows go in with chunked executemany under bulk-load PRAGMAs, and the
+    indexes from the migrations are only built once the tables are full.
+    The same seed always produces the same data.
+    """
+    remove_databases()
+    if not os.path.exists('database'):
+        os.makedirs('database')
+
+    gen = Generator(seed)
+    started = time.perf_counter()
+    total = 0
+    # Timestamps go in as epoch seconds and SQLite formats them
+    as_time = "datetime(?, 'unixepoch')"
+
+    conn = bulk_connect('database/auth.db')
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    with open('database/schema.sql', 'r') as f:
+        conn.executescript(f.read())
+    # Every generated user shares one hash, so seeding doesn't run scrypt millions of times
+    password_hash = PasswordHasher(workers=0).hash(GENERATED_PASSWORD)
+    users = counts['users']
+    total += load(conn, 'users', f'''
+        INSERT INTO users (name, email, password_hash, created_at, last_login, is_active)
+        VALUES (?, ?, ?, {as_time}, {as_time}, ?)
+    ''', gen.users(users, password_hash), chunk_size)
+    total += load(conn, 'sessions', f'''
+        INSERT INTO sessions (user_id, session_token, created_at, expires_at)
+        VALUES (?, ?, {as_time}, {as_time})
+    ''', gen.sessions(counts['sessions'] if users else 0, users), chunk_size)
+    total += load(conn, 'login_attempts', f'''
+        INSERT INTO login_attempts (email, ip_address, attempt_time, is_successful)
+        VALUES (?, ?, {as_time}, ?)
+    ''', gen.login_attempts(counts['login_attempts']), chunk_size)
+    print(f"auth indexes: {finish(conn, AUTH_MIGRATIONS, 'DELETE'):.1f}s")
+    conn.close()
+
+    conn = bulk_connect('data_science_hub.db')
+    conn.executescript(HUB_SCHEMA)
+    total += load(conn, 'courses', f'''
+        INSERT INTO courses (title, level, instructor, price, duration, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, {as_time})
+    ''', gen.courses(counts['courses']), chunk_size)
+    total += load(conn, 'course_details', '''
+        INSERT INTO course_details (course_id, description, learning_objectives, prerequisites, syllabus)
+        VALUES (?, ?, ?, ?, ?)
+    ''', gen.course_details(counts['courses']), chunk_size)
+    total += load(conn, 'blog_posts', f'''
+        INSERT INTO blog_posts (title, author, content, status, created_at)
+        VALUES (?, ?, ?, ?, {as_time})
+    ''', gen.blog_posts(counts['blog_posts']), chunk_size)
+    total += load(conn, 'services', f'''
+        INSERT INTO services (name, description, price, status, created_at)
+        VALUES (?, ?, ?, ?, {as_time})
+    ''', gen.services(counts['services']), chunk_size)
+    index_started = time.perf_counter()
+    conn.isolation_level = ''
+    ensure_search_indexes(conn)
+    conn.commit()
+    print(f"search indexes: {time.perf_counter() - index_started:.1f}s")
+    print(f"hub indexes: {finish(conn, HUB_MIGRATIONS, 'WAL'):.1f}s")
+    conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"\nGenerated {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s), seed {seed}")
+    print(f"Every generated user's password is '{GENERATED_PASSWORD}'")
+
 if __name__ == "__main__":
-    reset_database() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Reset the databases to sample or synthetic data')
+    parser.add_argument('--generate', action='store_true',
+                        help='fill the databases with synthetic data instead of the small sample set')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiply every default row count (1.0 is about 10M rows)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    for table, count in GENERATE_COUNTS.items():
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, metavar='N',
+                            help=f'rows to generate (default {count:,} x scale)')
+    args = parser.parse_args()
+
+    if args.generate:
+        counts = {}
+        for table, count in GENERATE_COUNTS.items():
+            requested = getattr(args, table)
+            counts[table] = requested if requested is not None else int(count * args.scale)
+        generate_database(counts, seed=args.seed, chunk_size=args.chunk_size)
+    else:
+        reset_database() 
\ No newline at end of file
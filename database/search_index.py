@@ -0,0 +1,131 @@
+import re
+import sqlite3
+import sys
+
+# Searchable columns per content table, matching what the admin search
+# endpoints used to scan with LIKE.
+SEARCH_INDEXES = {
+    'courses': ('title', 'instructor'),
+    'blog_posts': ('title', 'author', 'content'),
+    'services': ('name', 'description'),
+}
+
+# The same for auth.db, where the index is created by a migration step
+AUTH_SEARCH_INDEXES = {
+    'users': ('name', 'email'),
+}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_table(table):
+    return f'{table}_fts'
+
+
+def _table_exists(conn, name):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+        (name,)
+    ).fetchone()
+    return row is not None
+
+
+def _index_sql(table, columns):
+    fts = fts_table(table)
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f'''CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {cols},
+            content='{table}',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )''',
+        f'''CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+        END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+        END''',
+    ]
+
+
+def create_search_index(conn, table, columns):
+    """Create one FTS5 shadow table and its triggers, populating it if it is new.
+
+    Raises sqlite3.OperationalError when SQLite was built without FTS5.
+    """
+    created = not _table_exists(conn, fts_table(table))
+    for statement in _index_sql(table, columns):
+        conn.execute(statement)
+    if created:
+        rebuild_search_index(conn, table)
+
+
+def has_search_index(conn, table):
+    return _table_exists(conn, fts_table(table))
+
+
+def ensure_search_indexes(conn):
+    """Create FTS5 shadow tables and sync triggers for every existing content table.
+
+    Returns the set of tables that have a search index. Indexes created for
+    the first time are populated from the existing rows.
+    """
+    indexed = set()
+    for table, columns in SEARCH_INDEXES.items():
+        if not _table_exists(conn, table):
+            continue
+        try:
+            create_search_index(conn, table, columns)
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5; callers fall back to LIKE scans
+            conn.rollback()
+            return set()
+        indexed.add(table)
+    conn.commit()
+    return indexed
+
+
+def rebuild_search_index(conn, table):
+    """Repopulate one search index from its content table"""
+    fts = fts_table(table)
+    conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def rebuild_search_indexes(conn):
+    """Rebuild every search index from scratch; returns the tables rebuilt"""
+    tables = ensure_search_indexes(conn)
+    for table in sorted(tables):
+        rebuild_search_index(conn, table)
+        conn.execute(f"INSERT INTO {fts_table(table)}({fts_table(table)}) VALUES ('optimize')")
+    conn.commit()
+    return tables
+
+
+def build_match_query(query):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word must match, and each word also matches as a prefix so
+    results update as the admin types. Returns None if there is nothing
+    to search for.
+    """
+    tokens = _TOKEN_RE.findall(query or '')
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+if __name__ == '__main__':
+    # One-shot rebuild: python -m database.search_index [db_path]
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'data_science_hub.db'
+    conn = sqlite3.connect(db_path)
+    rebuilt = rebuild_search_indexes(conn)
+    conn.close()
+    print(f"Rebuilt search indexes in {db_path}: {', '.join(sorted(rebuilt)) or 'none'}")
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionCache:
+    """LRU cache of session token -> user_id with a TTL.
+
+    Entries expire after ``ttl`` seconds or at the session's own
+    ``expires_at``, whichever comes first. Only valid sessions are cached,
+    so unknown tokens cannot push real sessions out. The cache is per
+    process and the sessions table is what workers share: a logout in one
+    worker reaches the others once their copy expires and they look the
+    token up again. ``ttl`` bounds that window, so it defaults to a few
+    seconds; a busy token still costs one query per ttl rather than one
+    per request.
+    """
+
+    def __init__(self, max_size=10000, ttl=5):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token):
+        """Return the cached user_id for token, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            user_id, expires = entry
+            if expires <= now:
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user_id
+
+    def put(self, token, user_id, expires_at):
+        """Cache a valid session; expires_at is the session's datetime expiry"""
+        expires = min(time.time() + self.ttl, expires_at.timestamp())
+        with self._lock:
+            self._entries[token] = (user_id, expires)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, token):
+        with self._lock:
+            if self._entries.pop(token, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id):
+        """Drop every cached session belonging to user_id"""
+        with self._lock:
+            tokens = [token for token, (owner, _) in self._entries.items() if owner == user_id]
+            for token in tokens:
+                del self._entries[token]
+            self.invalidations += len(tokens)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,126 @@
+import logging
+import re
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from database import tracing
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def redact(parameters):
+    """Describe bound parameters by type and size, never by value"""
+    def describe(value):
+        if value is None:
+            return 'NULL'
+        if isinstance(value, (str, bytes)):
+            return f'{type(value).__name__}({len(value)})'
+        return type(value).__name__
+
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {key: describe(value) for key, value in parameters.items()}
+    return [describe(value) for value in parameters]
+
+
+class SlowQueryLog:
+    """Ring buffer of SQL statements slower than threshold_ms.
+
+    Registered as a database.tracing listener, so it sees every statement
+    on connections from the pool and DatabaseHandler. Each slow statement
+    is logged with redacted parameters, its duration (execute plus reading
+    its rows, since most of a SELECT's work happens while rows are fetched)
+    and its EXPLAIN QUERY PLAN; plans are cached per statement text so a
+    hot slow query is only explained once. Entries flagged full_scan read a whole table without
+    an index.
+    """
+
+    def __init__(self, threshold_ms=100, max_entries=200, plan_cache_size=256):
+        self.threshold = threshold_ms / 1000
+        self.entries = deque(maxlen=max_entries)
+        self.plan_cache_size = plan_cache_size
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self.slow = 0
+
+    def enable(self):
+        tracing.add_listener(self.on_query)
+
+    def disable(self):
+        tracing.remove_listener(self.on_query)
+
+    def on_query(self, conn, sql, parameters, seconds):
+        if seconds < self.threshold:
+            return
+        sql = WHITESPACE_RE.sub(' ', sql).strip()
+        plan = self._plan(conn, sql, parameters)
+        entry = {
+            'at': datetime.now().isoformat(timespec='milliseconds'),
+            'db': conn.label,
+            'duration_ms': round(seconds * 1000, 3),
+            'sql': sql,
+            'parameters': redact(parameters),
+            'plan': plan,
+            'full_scan': any(
+                step.startswith('SCAN ') and ' USING ' not in step for step in plan or ()
+            ),
+        }
+        with self._lock:
+            self.slow += 1
+            self.entries.append(entry)
+        logger.warning(
+            "Slow query on %s (%.1f ms)%s: %s | plan: %s",
+            entry['db'], entry['duration_ms'], ' [full scan]' if entry['full_scan'] else '',
+            sql, '; '.join(plan) if plan else 'n/a'
+        )
+
+    def _plan(self, conn, sql, parameters):
+        """EXPLAIN QUERY PLAN detail lines, or None if the statement can't be explained"""
+        if not sql.upper().startswith(EXPLAINABLE):
+            return None
+        with self._lock:
+            plan = self._plans.get(sql)
+            if plan is not None:
+                self._plans.move_to_end(sql)
+                return plan
+        if parameters is None:
+            # executemany: plan with NULLs standing in for each row's values
+            parameters = [None] * sql.count('?')
+        try:
+            # The base-class execute bypasses tracing, so this isn't traced itself
+            rows = sqlite3.Connection.execute(conn, 'EXPLAIN QUERY PLAN ' + sql, parameters).fetchall()
+        except sqlite3.Error:
+            return None
+        plan = [row[-1] for row in rows]
+        with self._lock:
+            self._plans[sql] = plan
+            while len(self._plans) > self.plan_cache_size:
+                self._plans.popitem(last=False)
+        return plan
+
+    def recent(self, limit=None):
+        """Newest entries first"""
+        with self._lock:
+            entries = list(self.entries)
+        entries.reverse()
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self._plans.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'threshold_ms': round(self.threshold * 1000, 3),
+                'slow_queries': self.slow,
+                'buffered': len(self.entries),
+                'max_entries': self.entries.maxlen,
+            }
@@ -0,0 +1,156 @@
+"""Query tracing for SQLite connections.
+
+Connections opened with connect() time every execute, executemany and
+executescript call, together with the fetches that read its rows, and
+pass (connection, sql, parameters, seconds) to each registered listener.
+Listeners run on the querying thread, after the statement, so they must
+be cheap. With no listeners registered the only cost is one list check
+per statement.
+"""
+import os
+import sqlite3
+import time
+
+_listeners = []
+
+
+def add_listener(listener):
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def _notify(conn, sql, parameters, seconds):
+    for listener in _listeners:
+        listener(conn, sql, parameters, seconds)
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement once its rows have been read.
+
+    SQLite computes rows as they are stepped, so execute() often returns
+    after the first row and the real cost of a query lands in the fetch
+    calls. A statement that returns rows is therefore reported once the
+    cursor is exhausted, or when it is re-executed, closed or collected,
+    with the time spent in execute and every fetch added together.
+    """
+
+    _pending = None
+
+    def _report(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            _notify(self.connection, *pending)
+
+    def _traced(self, sql, parameters, run, *args):
+        self._report()
+        if not _listeners:
+            return run(*args)
+        started = time.perf_counter()
+        try:
+            result = run(*args)
+        except BaseException:
+            _notify(self.connection, sql, parameters, time.perf_counter() - started)
+            raise
+        seconds = time.perf_counter() - started
+        if self.description is None:
+            _notify(self.connection, sql, parameters, seconds)
+        else:
+            self._pending = [sql, parameters, seconds]
+        return result
+
+    def _fetched(self, started, exhausted):
+        self._pending[2] += time.perf_counter() - started
+        if exhausted:
+            self._report()
+
+    def execute(self, sql, parameters=()):
+        return self._traced(sql, parameters, super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._traced(sql, None, super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._traced(sql_script, None, super().executescript, sql_script)
+
+    def fetchone(self):
+        if self._pending is None:
+            return super().fetchone()
+        started = time.perf_counter()
+        row = None
+        try:
+            row = super().fetchone()
+            return row
+        finally:
+            self._fetched(started, row is None)
+
+    def fetchmany(self, size=None):
+        if self._pending is None:
+            return super().fetchmany(self.arraysize if size is None else size)
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = []
+        try:
+            rows = super().fetchmany(size)
+            return rows
+        finally:
+            self._fetched(started, len(rows) < size)
+
+    def fetchall(self):
+        if self._pending is None:
+            return super().fetchall()
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._fetched(started, True)
+
+    def __next__(self):
+        if self._pending is None:
+            return super().__next__()
+        started = time.perf_counter()
+        exhausted = True
+        try:
+            row = super().__next__()
+            exhausted = False
+            return row
+        finally:
+            self._fetched(started, exhausted)
+
+    def close(self):
+        self._report()
+        super().close()
+
+    def __del__(self):
+        self._report()
+
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors, and shortcut execute methods, are traced"""
+
+    # Short database name used to label metrics, e.g. 'auth'
+    label = None
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # The built-in shortcuts create plain cursors, bypassing cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+def connect(db_path, **kwargs):
+    """sqlite3.connect() returning a TracedConnection labelled after the file name"""
+    conn = sqlite3.connect(db_path, factory=TracedConnection, **kwargs)
+    conn.label = os.path.splitext(os.path.basename(db_path))[0]
+    return conn
@@ -1,13 +1,124 @@
+import os
 import sqlite3
+import threading
+import time
+from database import tracing
+from database.catalog_cache import CatalogCache
+from database.migrations import HUB_MIGRATIONS, migrate, schema_version
+from database.models import BlogPost, Course, CourseDetails, Service
+from database.pagination import DEFAULT_PAGE_SIZE, encode_cursor, keyset_query
+from database.search_index import build_match_query, ensure_search_indexes, rebuild_search_indexes
+
+COURSE_COLUMNS = ('id', 'title', 'level', 'instructor', 'price', 'duration', 'pdf_path', 'status', 'created_at')
+BLOG_POST_COLUMNS = ('id', 'title', 'author', 'content', 'status', 'created_at')
+COURSE_DETAIL_COLUMNS = ('description', 'learning_objectives', 'prerequisites', 'syllabus')
+SERVICE_COLUMNS = ('id', 'name', 'description', 'price', 'status', 'created_at')
+
+# Row model for each content table; see database/models.py
+TABLE_MODELS = {'courses': Course, 'blog_posts': BlogPost, 'services': Service}
+
+def dict_rows(cursor):
+    """Make the rows of cursor's current query {column: value} dicts; call after execute().
+
+    Column names are read once per query, so each row costs one dict(zip()).
+    """
+    columns = tuple(column[0] for column in cursor.description)
+    cursor.row_factory = lambda _, row: dict(zip(columns, row))
+    return cursor
+
+def model_rows(cursor, model):
+    """Make the rows of cursor's current query model instances; call after execute()"""
+    cursor.row_factory = model.mapper(column[0] for column in cursor.description)
+    return cursor
+
+# Content databases already set up in this process: path -> {'fts_tables', 'seconds'}
+_initialized = {}
+_init_lock = threading.Lock()
 
 class DatabaseHandler:
-    def __init__(self):
-        self.conn = sqlite3.connect('data_science_hub.db')
-        self.cursor = self.conn.cursor()
-        self.create_tables()
+    """Content database access with one connection and cursor per thread.
+
+    Each worker thread (or greenlet, when gevent patches threading) lazily
+    opens its own connection, so concurrent requests never share a cursor.
+    The database runs in WAL mode so readers proceed while a writer commits.
+    Tables are created on the first query, once per process.
+    """
+
+    def __init__(self, db_path='data_science_hub.db'):
+        self.db_path = db_path
+        self.busy_timeout = float(os.getenv('DB_BUSY_TIMEOUT', 10))
+        self._local = threading.local()
+        self.catalog_cache = CatalogCache(ttl=int(os.getenv('CATALOG_CACHE_TTL', 60)))
+
+    def _connect(self):
+        return tracing.connect(self.db_path, timeout=self.busy_timeout)
+
+    @property
+    def conn(self):
+        """Connection owned by the calling thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            try:
+                self._ensure_initialized()
+            except Exception:
+                self.close()
+                raise
+        return conn
+
+    @property
+    def cursor(self):
+        """Cursor owned by the calling thread"""
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self._local.cursor = self.conn.cursor()
+        return cursor
+
+    def close(self):
+        """Close the calling thread's connection, if it opened one"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            self._local.cursor = None
+            conn.close()
+
+    def _ensure_initialized(self):
+        if self.db_path in _initialized:
+            return
+        with _init_lock:
+            if self.db_path in _initialized:
+                return
+            started = time.perf_counter()
+            fts_tables = self.create_tables()
+            _initialized[self.db_path] = {
+                'fts_tables': fts_tables,
+                'seconds': time.perf_counter() - started,
+            }
+
+    @property
+    def fts_tables(self):
+        """Tables with a full-text search index"""
+        if self.db_path not in _initialized:
+            self.conn  # opening a connection sets the database up
+        return _initialized[self.db_path]['fts_tables']
+
+    @property
+    def init_seconds(self):
+        """Time spent setting up this database in this process, None until the first query"""
+        entry = _initialized.get(self.db_path)
+        return entry['seconds'] if entry else None
 
     def create_tables(self):
-        # ... existing table creation code ...
+        """Create tables and apply migrations, then return the tables with FTS indexes.
+
+        The table DDL is skipped once the schema version shows it has run.
+        """
+        if schema_version(self.conn) >= len(HUB_MIGRATIONS):
+            return ensure_search_indexes(self.conn)
+
+        # WAL lets readers run concurrently with a single writer
+        self.conn.execute('PRAGMA journal_mode=WAL')
+
 
         # Courses table
         self.cursor.execute('''
@@ -50,67 +161,175 @@ class DatabaseHandler:
             )
         ''')
 
-        self.conn.commit()
+        # Blog posts table
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS blog_posts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                author TEXT NOT NULL,
+                content TEXT NOT NULL,
+                status TEXT DEFAULT 'active',
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
 
-    # User Management
-    def get_all_users(self):
+        # Services table
         self.cursor.execute('''
-            SELECT id, username, email, role, status, created_at
-            FROM users
-            ORDER BY created_at DESC
+            CREATE TABLE IF NOT EXISTS services (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL,
+                price REAL NOT NULL,
+                status TEXT DEFAULT 'active',
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
         ''')
-        return self.cursor.fetchall()
 
-    def delete_user(self, user_id):
-        self.cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
         self.conn.commit()
+        migrate(self.conn, HUB_MIGRATIONS)
+
+        # Full-text search indexes, kept in sync by triggers
+        return ensure_search_indexes(self.conn)
+
+    def rebuild_search_indexes(self):
+        """Rebuild all full-text search indexes from the content tables"""
+        fts_tables = rebuild_search_indexes(self.conn)
+        _initialized[self.db_path]['fts_tables'] = fts_tables
+        return fts_tables
+
+    def _search(self, table, columns, search_columns, query, filter_column, filter):
+        """Search a content table, ranked by bm25 when it has an FTS index.
+
+        An empty query matches every row, like the old LIKE '%%' scan did.
+        Tables without an FTS index fall back to LIKE matching.
+        """
+        select = ', '.join(f't.{c}' for c in columns)
+        match = build_match_query(query)
+        params = []
+
+        if match is None:
+            sql = f'SELECT {select} FROM {table} t WHERE 1 = 1'
+            order = 't.created_at DESC'
+        elif table in self.fts_tables:
+            fts = f'{table}_fts'
+            sql = f'SELECT {select} FROM {fts} JOIN {table} t ON t.id = {fts}.rowid WHERE {fts} MATCH ?'
+            params.append(match)
+            order = f'bm25({fts}), t.created_at DESC'
+        else:
+            sql = f'SELECT {select} FROM {table} t WHERE (' + ' OR '.join(f't.{c} LIKE ?' for c in search_columns) + ')'
+            params.extend(f'%{query}%' for _ in search_columns)
+            order = 't.created_at DESC'
 
-    def search_users(self, query, filter='all'):
-        sql = '''
-            SELECT id, username, email, role, status, created_at
-            FROM users
-            WHERE (username LIKE ? OR email LIKE ?)
-        '''
-        params = [f'%{query}%', f'%{query}%']
-        
         if filter != 'all':
-            sql += ' AND status = ?'
+            sql += f' AND t.{filter_column} = ?'
             params.append(filter)
-        
-        sql += ' ORDER BY created_at DESC'
-        self.cursor.execute(sql, params)
-        return self.cursor.fetchall()
+
+        sql += f' ORDER BY {order}'
+        return self._select(sql, params, TABLE_MODELS[table])
+
+    def _select(self, sql, params=(), model=None):
+        """All rows of a query as model instances, or as dicts without a model"""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            if model is None:
+                return dict_rows(cursor).fetchall()
+            return model_rows(cursor, model).fetchall()
+        finally:
+            cursor.close()
+
+    def _page(self, table, columns, where=None, after=None, limit=DEFAULT_PAGE_SIZE):
+        """One newest-first page of rows, plus the cursor for the next page"""
+        sql, params = keyset_query(table, columns, where, after, limit)
+        rows = self._select(sql, params, TABLE_MODELS[table])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        return rows, next_cursor
+
+    def _iter_rows(self, table, columns, where=None, batch_size=500):
+        """Yield every row as a model instance, newest first, holding one batch in memory"""
+        sql = f"SELECT {', '.join(columns)} FROM {table}"
+        if where:
+            sql += f' WHERE {where}'
+        sql += ' ORDER BY created_at DESC, id DESC'
+        cursor = model_rows(self.conn.cursor().execute(sql), TABLE_MODELS[table])
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
 
     # Course Management
     def get_all_courses(self):
-        self.cursor.execute('''
+        return self._select('''
             SELECT id, title, level, instructor, price, duration, pdf_path, status, created_at
             FROM courses
             WHERE status = 'active'
             ORDER BY created_at DESC
-        ''')
-        columns = [col[0] for col in self.cursor.description]
-        return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+        ''', model=Course)
+
+    def get_courses_page(self, after=None, limit=DEFAULT_PAGE_SIZE):
+        return self._page('courses', COURSE_COLUMNS, "status = 'active'", after, limit)
+
+    def iter_courses(self):
+        return self._iter_rows('courses', COURSE_COLUMNS, "status = 'active'")
 
     def get_course_by_id(self, course_id):
-        self.cursor.execute('''
+        rows = self._select('''
             SELECT id, title, level, instructor, price, duration, pdf_path, status, created_at
             FROM courses
             WHERE id = ? AND status = 'active'
-        ''', (course_id,))
-        columns = [col[0] for col in self.cursor.description]
-        row = self.cursor.fetchone()
-        return dict(zip(columns, row)) if row else None
+        ''', (course_id,), Course)
+        return rows[0] if rows else None
 
     def get_course_details(self, course_id):
-        self.cursor.execute('''
+        rows = self._select('''
             SELECT description, learning_objectives, prerequisites, syllabus
             FROM course_details
             WHERE course_id = ?
-        ''', (course_id,))
-        columns = [col[0] for col in self.cursor.description]
-        row = self.cursor.fetchone()
-        return dict(zip(columns, row)) if row else {}
+        ''', (course_id,), CourseDetails)
+        return rows[0] if rows else {}
+
+    def get_courses_with_details(self, course_ids=None):
+        """Active courses with their details attached, fetched in one joined query.
+
+        Returns every active course when course_ids is None, newest first.
+        """
+        if course_ids is not None and not course_ids:
+            return []
+        select = ', '.join([f'c.{c}' for c in COURSE_COLUMNS] + [f'd.{c}' for c in COURSE_DETAIL_COLUMNS])
+        sql = f'''
+            SELECT {select}, d.course_id
+            FROM courses c
+            LEFT JOIN course_details d ON d.course_id = c.id
+            WHERE c.status = 'active'
+        '''
+        params = []
+        if course_ids is not None:
+            sql += f" AND c.id IN ({', '.join('?' * len(course_ids))})"
+            params.extend(course_ids)
+        sql += ' ORDER BY c.created_at DESC, c.id DESC, d.id'
+
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        courses = {}
+        split = len(COURSE_COLUMNS)
+        course_row = Course.mapper(COURSE_COLUMNS)
+        details_row = CourseDetails.mapper(COURSE_DETAIL_COLUMNS)
+        for row in cursor.fetchall():
+            course_id = row[0]
+            if course_id in courses:
+                continue
+            course = course_row(cursor, row[:split])
+            has_details = row[-1] is not None
+            course['details'] = details_row(cursor, row[split:-1]) if has_details else {}
+            courses[course_id] = course
+        return list(courses.values())
 
     def create_course(self, title, level, instructor, price, duration, pdf_path=None):
         self.cursor.execute('''
@@ -118,7 +337,9 @@ class DatabaseHandler:
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (title, level, instructor, price, duration, pdf_path))
         self.conn.commit()
-        return self.cursor.lastrowid
+        course_id = self.cursor.lastrowid
+        self.catalog_cache.invalidate(course_id)
+        return course_id
 
     def create_course_details(self, course_id, description=None, learning_objectives=None, prerequisites=None, syllabus=None):
         self.cursor.execute('''
@@ -126,6 +347,7 @@ class DatabaseHandler:
             VALUES (?, ?, ?, ?, ?)
         ''', (course_id, description, learning_objectives, prerequisites, syllabus))
         self.conn.commit()
+        self.catalog_cache.invalidate(course_id)
 
     def update_course(self, course_id, title=None, level=None, instructor=None, price=None, duration=None, pdf_path=None):
         update_fields = []
@@ -158,6 +380,7 @@ class DatabaseHandler:
                 WHERE id = ?
             ''', params)
             self.conn.commit()
+            self.catalog_cache.invalidate(course_id)
 
     def update_course_details(self, course_id, description=None, learning_objectives=None, prerequisites=None, syllabus=None):
         update_fields = []
@@ -184,84 +407,188 @@ class DatabaseHandler:
                 WHERE course_id = ?
             ''', params)
             self.conn.commit()
+            self.catalog_cache.invalidate(course_id)
 
     def delete_course(self, course_id):
         self.cursor.execute('UPDATE courses SET status = "inactive" WHERE id = ?', (course_id,))
         self.conn.commit()
+        self.catalog_cache.invalidate(course_id)
+
+    def _insert_courses(self, rows):
+        """Insert (row, course, details) tuples in the open transaction; returns their ids"""
+        self.conn.executemany('''
+            INSERT INTO courses (title, level, instructor, price, duration, pdf_path)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [course for _, course, _ in rows])
+        # The write lock is held, so the chunk's AUTOINCREMENT ids are consecutive
+        last_id = self.conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        ids = list(range(last_id - len(rows) + 1, last_id + 1))
+        self.conn.executemany('''
+            INSERT INTO course_details (course_id, description, learning_objectives, prerequisites, syllabus)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(course_id,) + details for course_id, (_, _, details) in zip(ids, rows) if details])
+        return ids
+
+    def _import_chunk(self, rows, errors):
+        """Write one chunk in its own transaction, falling back to row by row if it fails"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            ids = self._insert_courses(rows)
+            self.conn.commit()
+            return ids
+        except sqlite3.Error:
+            self.conn.rollback()
+
+        ids = []
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            for row in rows:
+                self.conn.execute('SAVEPOINT import_row')
+                try:
+                    ids.extend(self._insert_courses([row]))
+                    self.conn.execute('RELEASE import_row')
+                except sqlite3.Error as e:
+                    self.conn.execute('ROLLBACK TO import_row')
+                    self.conn.execute('RELEASE import_row')
+                    errors.append({'row': row[0], 'error': str(e)})
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return ids
+
+    def import_courses(self, parsed, chunk_size=500, max_errors=1000):
+        """Bulk insert courses from parse_courses() output.
+
+        Rows are written with executemany in chunks of chunk_size, one
+        transaction per chunk. Invalid rows are reported and skipped; they
+        never abort the rest of the upload. If a later chunk fails outright,
+        the chunks already committed stay and the result lists them, with
+        the failure under 'error'.
+        """
+        created = []
+        errors = []
+        total = 0
+        chunk = []
+        failure = None
+        try:
+            for row, values, error in parsed:
+                total += 1
+                if error is not None:
+                    errors.append({'row': row, 'error': error})
+                    continue
+                chunk.append((row,) + values)
+                if len(chunk) >= chunk_size:
+                    created.extend(self._import_chunk(chunk, errors))
+                    chunk = []
+            if chunk:
+                created.extend(self._import_chunk(chunk, errors))
+        except Exception as e:
+            if not created:
+                raise
+            failure = str(e)
+        finally:
+            if created:
+                self.catalog_cache.invalidate()
+
+        result = {
+            'rows': total,
+            'created': len(created),
+            'ids': created,
+            'failed': len(errors),
+            'errors': errors[:max_errors],
+        }
+        if failure is not None:
+            result['error'] = failure
+        return result
+
+    def bulk_update_courses(self, course_ids, action, chunk_size=500):
+        """Deactivate or delete many courses, one transaction per chunk.
+
+        Ids that do not exist are reported as errors and skipped.
+        """
+        if action not in ('deactivate', 'delete'):
+            raise ValueError(f"Unknown action '{action}'")
+        updated = 0
+        errors = []
+        for start in range(0, len(course_ids), chunk_size):
+            chunk = course_ids[start:start + chunk_size]
+            placeholders = ', '.join('?' for _ in chunk)
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                found = {row[0] for row in self.conn.execute(
+                    f'SELECT id FROM courses WHERE id IN ({placeholders})', chunk
+                )}
+                params = [(course_id,) for course_id in chunk if course_id in found]
+                if action == 'delete':
+                    self.conn.executemany('DELETE FROM course_details WHERE course_id = ?', params)
+                    self.conn.executemany('DELETE FROM courses WHERE id = ?', params)
+                else:
+                    self.conn.executemany("UPDATE courses SET status = 'inactive' WHERE id = ?", params)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            updated += len(params)
+            errors.extend({'id': course_id, 'error': 'Course not found'}
+                          for course_id in chunk if course_id not in found)
+        if updated:
+            self.catalog_cache.invalidate()
+        return {'requested': len(course_ids), 'updated': updated, 'failed': len(errors), 'errors': errors}
 
     def search_courses(self, query, filter='all'):
-        sql = '''
-            SELECT id, title, level, instructor, price, status, created_at
-            FROM courses
-            WHERE (title LIKE ? OR instructor LIKE ?)
-        '''
-        params = [f'%{query}%', f'%{query}%']
-        
-        if filter != 'all':
-            sql += ' AND level = ?'
-            params.append(filter)
-        
-        sql += ' ORDER BY created_at DESC'
-        self.cursor.execute(sql, params)
-        return self.cursor.fetchall()
+        return self._search(
+            'courses', ('id', 'title', 'level', 'instructor', 'price', 'status', 'created_at'),
+            ('title', 'instructor'), query, 'level', filter
+        )
 
     # Blog Management
     def get_all_blog_posts(self):
-        self.cursor.execute('''
+        return self._select('''
             SELECT id, title, author, content, status, created_at
             FROM blog_posts
             ORDER BY created_at DESC
-        ''')
-        return self.cursor.fetchall()
+        ''', model=BlogPost)
+
+    def get_blog_posts_page(self, after=None, limit=DEFAULT_PAGE_SIZE):
+        return self._page('blog_posts', BLOG_POST_COLUMNS, after=after, limit=limit)
+
+    def iter_blog_posts(self):
+        return self._iter_rows('blog_posts', BLOG_POST_COLUMNS)
 
     def delete_blog_post(self, post_id):
         self.cursor.execute('DELETE FROM blog_posts WHERE id = ?', (post_id,))
         self.conn.commit()
 
     def search_blog_posts(self, query, filter='all'):
-        sql = '''
-            SELECT id, title, author, content, status, created_at
-            FROM blog_posts
-            WHERE (title LIKE ? OR author LIKE ? OR content LIKE ?)
-        '''
-        params = [f'%{query}%', f'%{query}%', f'%{query}%']
-        
-        if filter != 'all':
-            sql += ' AND status = ?'
-            params.append(filter)
-        
-        sql += ' ORDER BY created_at DESC'
-        self.cursor.execute(sql, params)
-        return self.cursor.fetchall()
+        return self._search(
+            'blog_posts', ('id', 'title', 'author', 'content', 'status', 'created_at'),
+            ('title', 'author', 'content'), query, 'status', filter
+        )
 
     # Service Management
     def get_all_services(self):
-        self.cursor.execute('''
+        return self._select('''
             SELECT id, name, description, price, status, created_at
             FROM services
             ORDER BY created_at DESC
-        ''')
-        return self.cursor.fetchall()
+        ''', model=Service)
+
+    def get_services_page(self, after=None, limit=DEFAULT_PAGE_SIZE):
+        return self._page('services', SERVICE_COLUMNS, after=after, limit=limit)
+
+    def iter_services(self):
+        return self._iter_rows('services', SERVICE_COLUMNS)
 
     def delete_service(self, service_id):
         self.cursor.execute('DELETE FROM services WHERE id = ?', (service_id,))
         self.conn.commit()
 
     def search_services(self, query, filter='all'):
-        sql = '''
-            SELECT id, name, description, price, status, created_at
-            FROM services
-            WHERE (name LIKE ? OR description LIKE ?)
-        '''
-        params = [f'%{query}%', f'%{query}%']
-        
-        if filter != 'all':
-            sql += ' AND status = ?'
-            params.append(filter)
-        
-        sql += ' ORDER BY created_at DESC'
-        self.cursor.execute(sql, params)
-        return self.cursor.fetchall()
+        return self._search(
+            'services', ('id', 'name', 'description', 'price', 'status', 'created_at'),
+            ('name', 'description'), query, 'status', filter
+        )
 
     # Admin Logging
     def log_admin_action(self, admin_id, action, target_type, target_id):
@@ -284,8 +611,4 @@ class DatabaseHandler:
             params.append(admin_id)
         
         sql += ' ORDER BY l.timestamp DESC'
-        self.cursor.execute(sql, params)
-        return self.cursor.fetchall()
-
-    def __del__(self):
-        self.conn.close() 
\ No newline at end of file
+        return self._select(sql, params) 
\ No newline at end of file
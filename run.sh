@@ -11,5 +11,8 @@ npm run build
 cd ..
 pip install -r requirements.txt
 
+# Precompress the built assets once, rather than in every worker
+python -m web.static_assets frontend/dist
+
 # Run the application
 python app.py 
\ No newline at end of file
@@ -0,0 +1,40 @@
+import os
+import secrets
+import shutil
+import sys
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The app, imported with its databases in a throwaway working directory"""
+    workdir = tmp_path_factory.mktemp('app')
+    os.makedirs(workdir / 'database')
+    shutil.copy(os.path.join(ROOT, 'database', 'schema.sql'), workdir / 'database')
+    cwd = os.getcwd()
+    # The app opens its databases relative to the working directory
+    os.chdir(workdir)
+    try:
+        import app
+        yield app
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def admin_headers(app_module):
+    # A unique jti, so revoking one test's token leaves the others valid
+    claims = {'role': 'admin', 'jti': secrets.token_hex(8), 'exp': datetime.utcnow() + timedelta(hours=1)}
+    token = jwt.encode(claims, app_module.token_cache.secret)
+    return {'Authorization': f'Bearer {token}'}
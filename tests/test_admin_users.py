@@ -0,0 +1,119 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from database import tracing
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'schema.sql')
+
+
+@pytest.fixture(scope='module')
+def users(app_module):
+    """Five users in auth.db with distinct creation times, newest first"""
+    db = app_module.db
+    conn = db.get_connection()
+    conn.execute('DELETE FROM users')
+    conn.executemany(
+        'INSERT INTO users (name, email, password_hash, created_at) VALUES (?, ?, ?, ?)',
+        [(f'User {i}', f'user{i}@example.com', 'x', f'2024-01-0{i} 00:00:00') for i in range(1, 6)]
+    )
+    conn.commit()
+    conn.close()
+    return [f'user{i}@example.com' for i in range(5, 0, -1)]
+
+
+def test_full_listing(client, admin_headers, users):
+    response = client.get('/api/admin/users', headers=admin_headers)
+    assert response.status_code == 200
+    assert [user['email'] for user in response.json] == users
+    assert 'password_hash' not in response.json[0]
+
+
+def test_keyset_pages(client, admin_headers, users):
+    seen = []
+    after = None
+    while True:
+        query = {'limit': 2}
+        if after:
+            query['after'] = after
+        response = client.get('/api/admin/users', query_string=query, headers=admin_headers)
+        assert response.status_code == 200
+        seen.extend(user['email'] for user in response.json['items'])
+        after = response.json['next_cursor']
+        if after is None:
+            break
+    assert seen == users
+
+
+def test_invalid_cursor(client, admin_headers, users):
+    response = client.get('/api/admin/users?after=bogus', headers=admin_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('fmt', ['json', 'ndjson'])
+def test_stream(client, admin_headers, users, fmt):
+    response = client.get(f'/api/admin/users?stream={fmt}', headers=admin_headers)
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    rows = json.loads(body) if fmt == 'json' else [json.loads(line) for line in body.splitlines()]
+    assert [row['email'] for row in rows] == users
+
+
+def test_search(client, admin_headers, users):
+    response = client.get('/api/admin/search/users?q=user3', headers=admin_headers)
+    assert response.status_code == 200
+    assert [user['email'] for user in response.json] == ['user3@example.com']
+
+
+def test_search_uses_index_and_follows_writes(app_module, client, admin_headers, users):
+    db = app_module.db
+    conn = db.get_connection()
+    plan = ' '.join(row[-1] for row in conn.execute(
+        'EXPLAIN QUERY PLAN SELECT rowid FROM users_fts WHERE users_fts MATCH ?', ('"ada"*',)))
+    assert 'VIRTUAL TABLE INDEX' in plan
+    conn.execute("INSERT INTO users (name, email, password_hash) VALUES ('Ada Lovelace', 'ada@engine.org', 'x')")
+    conn.commit()
+
+    def search(q):
+        response = client.get(f'/api/admin/search/users?q={q}', headers=admin_headers)
+        assert response.status_code == 200
+        return [user['email'] for user in response.json]
+
+    statements = []
+
+    def listener(conn, sql, parameters, seconds):
+        statements.append(sql)
+
+    tracing.add_listener(listener)
+    try:
+        assert search('love') == ['ada@engine.org']
+        tracing.remove_listener(listener)
+        assert any('users_fts MATCH' in sql for sql in statements)
+        assert search('engine.org') == ['ada@engine.org']
+        conn.execute("UPDATE users SET email = 'ada@analytical.org' WHERE email = 'ada@engine.org'")
+        conn.commit()
+        assert search('engine') == []
+        assert search('analytical') == ['ada@analytical.org']
+    finally:
+        tracing.remove_listener(listener)
+        conn.execute("DELETE FROM users WHERE name = 'Ada Lovelace'")
+        conn.commit()
+        conn.close()
+    assert search('ada') == []
+
+
+def test_search_index_migration_indexes_existing_users(tmp_path):
+    from database.migrations import AUTH_MIGRATIONS, migrate
+    from database.search_index import has_search_index
+
+    conn = sqlite3.connect(tmp_path / 'auth.db')
+    with open(SCHEMA) as f:
+        conn.executescript(f.read())
+    conn.execute("INSERT INTO users (name, email, password_hash) VALUES ('Grace Hopper', 'grace@navy.mil', 'x')")
+    conn.commit()
+    migrate(conn, AUTH_MIGRATIONS)
+    assert has_search_index(conn, 'users')
+    assert conn.execute("SELECT rowid FROM users_fts WHERE users_fts MATCH 'hop*'").fetchall() == [(1,)]
+    conn.close()
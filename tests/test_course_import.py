@@ -0,0 +1,66 @@
+import json
+import secrets
+
+
+def jsonl(*titles):
+    return [json.dumps({'title': title, 'level': 'Beginner', 'instructor': 'Ada',
+                        'price': 10, 'duration': '4 weeks'}).encode() + b'\n' for title in titles]
+
+
+def catalog_titles(client):
+    return {course['title'] for course in client.get('/api/courses').get_json()}
+
+
+def test_undecodable_line_fails_only_its_row(app_module, client, admin_headers, monkeypatch):
+    monkeypatch.setattr(app_module, 'IMPORT_CHUNK_SIZE', 1)
+    a, b, c = (f'Course {secrets.token_hex(4)}' for _ in range(3))
+    catalog_titles(client)  # cache the catalog before the import
+    first, second, third = jsonl(a, b, c)
+    body = first + second + b'{"title": "\xff"}\n' + third
+
+    response = client.post('/api/admin/courses/import?format=jsonl', data=body, headers=admin_headers)
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['rows'] == 4
+    assert result['created'] == 3 and len(result['ids']) == 3
+    assert result['errors'] == [{'row': 3, 'error': 'Row must be UTF-8 encoded'}]
+    assert {a, b, c} <= catalog_titles(client)
+
+
+def test_undecodable_csv_line_is_reported_in_order(app_module, client, admin_headers):
+    title = f'Course {secrets.token_hex(4)}'
+    body = (b'\xef\xbb\xbftitle,level,instructor,price,duration\n'
+            b'Caf\xe9,Beginner,Ada,10,4 weeks\n'
+            + f'{title},Beginner,Ada,10,4 weeks\n'.encode()
+            + b',Beginner,Ada,10,4 weeks\n')
+
+    response = client.post('/api/admin/courses/import?format=csv', data=body, headers=admin_headers)
+    result = response.get_json()
+    assert response.status_code == 200
+    assert result['created'] == 1
+    assert [error['row'] for error in result['errors']] == [2, 4]
+    assert result['errors'][0]['error'] == 'Row must be UTF-8 encoded'
+
+
+def test_committed_chunks_survive_a_later_failure(app_module, client, admin_headers, monkeypatch):
+    monkeypatch.setattr(app_module, 'IMPORT_CHUNK_SIZE', 1)
+    hub_db = app_module.hub_db
+    insert = hub_db._insert_courses
+    calls = []
+
+    def failing_insert(rows):
+        calls.append(rows)
+        if len(calls) > 1:
+            raise RuntimeError('disk full')
+        return insert(rows)
+
+    monkeypatch.setattr(hub_db, '_insert_courses', failing_insert)
+    title = f'Course {secrets.token_hex(4)}'
+    catalog_titles(client)
+    body = b''.join(jsonl(title, 'Never written'))
+
+    response = client.post('/api/admin/courses/import?format=jsonl', data=body, headers=admin_headers)
+    result = response.get_json()
+    assert response.status_code == 500
+    assert result['created'] == 1 and result['error'] == 'disk full'
+    assert title in catalog_titles(client)
@@ -0,0 +1,71 @@
+import time
+from email.message import EmailMessage
+
+import pytest
+
+from auth.email_queue import EmailDispatcher
+
+
+class FakeSMTP:
+    """Stands in for smtplib.SMTP; 'Broken' messages raise ValueError, 'Delay' ones sleep"""
+
+    def __init__(self, sent):
+        self.sent = sent
+
+    def send_message(self, msg):
+        if msg['Broken']:
+            raise ValueError('malformed message')
+        if msg['Delay']:
+            time.sleep(float(msg['Delay']))
+        self.sent.append(msg['To'])
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def dispatcher():
+    sent = []
+    dispatcher = EmailDispatcher('localhost', 25, workers=1, backoff=0)
+    dispatcher.connect = lambda: FakeSMTP(sent)
+    dispatcher.sent_to = sent
+    yield dispatcher
+    dispatcher.stop(timeout=5)
+
+
+def message(to, broken=False, delay=None):
+    msg = EmailMessage()
+    msg['To'] = to
+    if broken:
+        msg['Broken'] = 'yes'
+    if delay:
+        msg['Delay'] = str(delay)
+    return msg
+
+
+def test_unexpected_error_fails_future_and_keeps_worker(dispatcher):
+    failed = dispatcher.submit(message('a@example.com', broken=True))
+    with pytest.raises(ValueError):
+        failed.result(timeout=5)
+
+    # The same worker is still alive to send the next message
+    assert dispatcher.submit(message('b@example.com')).result(timeout=5) is True
+    assert dispatcher.sent_to == ['b@example.com']
+    stats = dispatcher.stats()
+    assert stats['failed'] == 1
+    assert stats['retries'] == 0
+
+
+def test_send_time_excludes_queue_wait(dispatcher):
+    slow = dispatcher.submit(message('a@example.com', delay=0.5))
+    queued = dispatcher.submit(message('b@example.com'))
+    slow.result(timeout=5)
+    queued.result(timeout=5)
+
+    stats = dispatcher.stats()
+    # Only the first message took time to send; the second spent it queued
+    assert 0.5 <= stats['send_seconds'] < 0.9
+    assert stats['wait_seconds'] >= 0.4
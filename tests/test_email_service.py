@@ -0,0 +1,38 @@
+import asyncio
+from concurrent.futures import Future
+
+from auth.email_queue import EmailQueueFull
+from auth.email_service import EmailService
+
+
+class StalledDispatcher:
+    """Accepts messages but never delivers them, like a queue stuck on SMTP retries"""
+
+    def __init__(self, full=False):
+        self.full = full
+        self.queued = []
+
+    def submit(self, msg):
+        if self.full:
+            raise EmailQueueFull('Email queue is full')
+        self.queued.append(msg['To'])
+        return Future()
+
+
+def test_async_send_returns_once_queued():
+    dispatcher = StalledDispatcher()
+    service = EmailService(dispatcher=dispatcher)
+    service.send_async = True
+
+    sent = asyncio.run(asyncio.wait_for(
+        service.send_verification_email_async('new@example.com', 'token'), timeout=1
+    ))
+    assert sent is True
+    assert dispatcher.queued == ['new@example.com']
+
+
+def test_async_send_reports_full_queue():
+    service = EmailService(dispatcher=StalledDispatcher(full=True))
+    service.send_async = True
+
+    assert asyncio.run(service.send_password_reset_email_async('new@example.com', 'token')) is False
@@ -0,0 +1,87 @@
+import logging
+
+import pytest
+from flask import Flask
+from werkzeug.wsgi import FileWrapper
+
+from web.file_delivery import FileDelivery
+
+
+@pytest.fixture
+def app(tmp_path):
+    (tmp_path / 'files').mkdir()
+    (tmp_path / 'files' / 'course.pdf').write_bytes(b'x' * 50000)
+    (tmp_path / 'secret.txt').write_text('secret')
+    app = Flask(__name__)
+    app.config['root'] = tmp_path / 'files'
+    return app
+
+
+def send(app, path, offload=None, download_name=None, **headers):
+    delivery = FileDelivery(str(app.config['root']), offload=offload)
+    with app.test_request_context(headers=headers):
+        return delivery.send(path, 'application/pdf', download_name)
+
+
+@pytest.mark.parametrize('path', ['../secret.txt', '/etc/passwd'])
+@pytest.mark.parametrize('offload', [None, 'nginx'])
+def test_paths_outside_root_are_refused(app, path, offload):
+    assert send(app, path, offload) is None
+
+
+def test_full_response_advertises_ranges(app):
+    response = send(app, 'course.pdf')
+    assert response.status_code == 200
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    response.close()
+
+
+def test_download_name_is_quoted(app):
+    for offload in (None, 'nginx'):
+        response = send(app, 'course.pdf', offload, download_name='a"bé.pdf')
+        disposition = response.headers['Content-Disposition']
+        assert 'filename*=UTF-8' in disposition
+        assert 'a"b' not in disposition.replace('\\"', '')
+        response.close()
+
+
+def test_nginx_offload(app):
+    response = send(app, 'course.pdf', 'nginx')
+    assert response.headers['X-Accel-Redirect'] == '/protected/course.pdf'
+    assert response.get_data() == b''
+
+
+def test_full_response_keeps_the_file_wrapper(app, caplog):
+    caplog.set_level(logging.INFO, logger='web.file_delivery')
+    response = send(app, 'course.pdf')
+    # Left unwrapped so the server's wsgi.file_wrapper can use sendfile
+    assert isinstance(response.response, FileWrapper)
+    response.close()
+    assert 'bytes=50000/50000 complete=True' in caplog.text
+
+
+def test_logs_range_bytes_actually_sent(app, caplog):
+    caplog.set_level(logging.INFO, logger='web.file_delivery')
+    response = send(app, 'course.pdf', Range='bytes=0-29999')
+    assert response.status_code == 206
+    body = iter(response.response)
+    next(body)  # the client goes away after the first chunk
+    response.close()
+    assert 'complete=False' in caplog.text
+
+    caplog.clear()
+    response = send(app, 'course.pdf', Range='bytes=0-29999')
+    assert len(b''.join(response.response)) == 30000
+    response.close()
+    assert 'bytes=30000/30000 complete=True' in caplog.text
+
+
+def test_range_download_is_logged_through_wsgi(app, caplog):
+    caplog.set_level(logging.INFO, logger='web.file_delivery')
+    delivery = FileDelivery(str(app.config['root']))
+    app.add_url_rule('/download', 'download', lambda: delivery.send('course.pdf', 'application/pdf'))
+
+    response = app.test_client().get('/download', headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206 and len(response.data) == 100
+    response.close()
+    assert 'bytes=100/100 complete=True' in caplog.text
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from auth.http_client import AsyncHttpClient, HttpClient
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(self.status_code)
+
+
+def test_get_many_recovers_from_half_open(monkeypatch):
+    http = HttpClient(failure_threshold=1, reset_timeout=0.05)
+    statuses = [503]
+
+    def request(method, url, **kwargs):
+        time.sleep(0.05)  # long enough for concurrent calls to overlap
+        return FakeResponse(statuses.pop(0) if statuses else 200)
+
+    monkeypatch.setattr(http.session, 'request', request)
+
+    # One failure opens the circuit
+    try:
+        http.get('github', 'https://api.github.com/user')
+    except requests.exceptions.HTTPError:
+        pass
+    assert http.breaker('github').state == 'open'
+
+    time.sleep(0.1)
+    # Both calls of the batch go through: the first is the trial that closes the circuit
+    responses = http.get_many('github', ['https://api.github.com/user', 'https://api.github.com/user/emails'])
+    assert [r.status_code for r in responses] == [200, 200]
+    assert http.breaker('github').state == 'closed'
+    assert http.breaker('github').rejected == 0
+    http.close()
+
+
+def open_circuit(http):
+    breaker = http.breaker('github')
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    time.sleep(0.1)
+    return breaker
+
+
+def test_cancelled_half_open_call_releases_the_trial():
+    http = HttpClient(failure_threshold=1, reset_timeout=0.05)
+    client = AsyncHttpClient(http)
+    breaker = open_circuit(http)
+    responses = []
+
+    async def request(method, url, **kwargs):
+        if not responses:
+            responses.append(url)
+            await asyncio.sleep(10)  # cancelled before GitHub answers
+        return FakeResponse(200)
+
+    client.client.request = request
+
+    async def main():
+        trial = asyncio.ensure_future(client.get('github', 'https://api.github.com/user'))
+        await asyncio.sleep(0.01)
+        assert breaker.state == 'half_open'
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert breaker.state == 'open'
+
+        await asyncio.sleep(0.1)
+        response = await client.get('github', 'https://api.github.com/user')
+        assert response.status_code == 200
+        await client.close()
+
+    asyncio.run(main())
+    assert breaker.state == 'closed'
+    http.close()
+
+
+def test_unexpected_error_in_half_open_call_releases_the_trial(monkeypatch):
+    http = HttpClient(failure_threshold=1, reset_timeout=0.05)
+    breaker = open_circuit(http)
+
+    def request(method, url, **kwargs):
+        raise ValueError('bad proxy URL')
+
+    monkeypatch.setattr(http.session, 'request', request)
+    with pytest.raises(ValueError):
+        http.get('github', 'https://api.github.com/user')
+    assert breaker.state == 'open'
+    http.close()
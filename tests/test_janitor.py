@@ -0,0 +1,45 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.janitor import Janitor
+
+
+@pytest.fixture
+def utc_plus_12(monkeypatch):
+    """Run with local time well ahead of UTC, so mixing the two shows"""
+    monkeypatch.setenv('TZ', 'Etc/GMT-12')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_rate_limit_retention_ignores_utc_offset(utc_plus_12):
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE rate_limits (
+            ip_address TEXT, action_type TEXT,
+            last_attempt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_blocked BOOLEAN DEFAULT 0, block_expires_at TIMESTAMP
+        )
+    ''')
+    utc_now = datetime.utcnow()
+    local_now = datetime.now()
+    fmt = '%Y-%m-%d %H:%M:%S'
+    conn.executemany('INSERT INTO rate_limits (ip_address, last_attempt, block_expires_at) VALUES (?, ?, ?)', [
+        # Attempts, stamped in UTC like CURRENT_TIMESTAMP
+        ('recent-attempt', (utc_now - timedelta(hours=20)).strftime(fmt), None),
+        ('old-attempt', (utc_now - timedelta(hours=30)).strftime(fmt), None),
+        # Blocks, whose expiry Python writes in local time
+        ('recent-block', (utc_now - timedelta(hours=40)).strftime(fmt),
+         (local_now - timedelta(hours=20)).strftime(fmt)),
+        ('old-block', (utc_now - timedelta(hours=40)).strftime(fmt),
+         (local_now - timedelta(hours=30)).strftime(fmt)),
+    ])
+    janitor = Janitor(lambda: conn, retention={'rate_limits': 24})
+    assert janitor.purge(conn, 'rate_limits') == 2
+    remaining = {row[0] for row in conn.execute('SELECT ip_address FROM rate_limits')}
+    assert remaining == {'recent-attempt', 'recent-block'}
@@ -0,0 +1,30 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from database.catalog_cache import CatalogCache
+from database.models import Course, CourseDetails, json_default
+from web import json_encoding
+
+
+def test_json_default_converts_models_and_dates():
+    course = Course(id=1, title='SQL', details=CourseDetails(id=2, course_id=1))
+    value = {'course': course, 'at': datetime(2024, 1, 2, 3, 4, 5), 'on': date(2024, 1, 2)}
+    assert json.loads(json.dumps(value, default=json_default)) == {
+        'course': {'id': 1, 'title': 'SQL', 'details': {'id': 2, 'course_id': 1}},
+        'at': 'Tue, 02 Jan 2024 03:04:05 GMT',
+        'on': 'Tue, 02 Jan 2024 00:00:00 GMT',
+    }
+
+
+@pytest.mark.parametrize('backend', ['stdlib', 'orjson'])
+def test_unknown_types_are_rejected(backend, monkeypatch):
+    if backend == 'orjson' and json_encoding.orjson is None:
+        pytest.skip('orjson is not installed')
+    monkeypatch.setattr(json_encoding, 'BACKEND', backend)
+    with pytest.raises(TypeError):
+        json_encoding.dumps({'price': Decimal('9.99')})
+    with pytest.raises(TypeError):
+        CatalogCache.encode([object()])
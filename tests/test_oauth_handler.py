@@ -0,0 +1,57 @@
+import asyncio
+import secrets
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def github_responses():
+    """Token, profile and email responses for a GitHub account the app has never seen"""
+    login = f'new{secrets.token_hex(4)}'
+    return (
+        FakeResponse({'access_token': 'token'}),
+        [FakeResponse({'id': 1, 'login': login, 'name': 'New User'}),
+         FakeResponse([{'email': f'{login}@example.com', 'primary': True}])],
+    )
+
+
+class FakeHttp:
+    def __init__(self):
+        self.token, self.profile = github_responses()
+
+    def post(self, provider, url, **kwargs):
+        return self.token
+
+    def get_many(self, provider, urls, **kwargs):
+        return self.profile
+
+
+class FakeAsyncHttp(FakeHttp):
+    async def post(self, provider, url, **kwargs):
+        return self.token
+
+    async def get_many(self, provider, urls, **kwargs):
+        return self.profile
+
+
+def test_first_github_login_redirects(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module.oauth_handler, 'http', FakeHttp())
+    response = client.get('/auth/github/callback?code=abc')
+    assert response.status_code == 302
+
+
+def test_first_github_login_redirects_async(app_module, monkeypatch):
+    handler = app_module.oauth_handler
+    monkeypatch.setattr(handler, '_async_http', FakeAsyncHttp())
+
+    async def run_sync(func, *args):
+        return func(*args)
+
+    with app_module.app.test_request_context('/auth/github/callback?code=abc'):
+        response = asyncio.run(handler.handle_github_callback_async('abc', run_sync))
+    assert response.status_code == 302
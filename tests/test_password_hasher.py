@@ -0,0 +1,34 @@
+import hashlib
+
+from auth.password_hasher import PasswordHasher
+
+
+def test_cost_is_pinned_from_env(monkeypatch):
+    monkeypatch.setenv('PASSWORD_HASH_N', '4096')
+    assert PasswordHasher(workers=0).n == 4096
+
+
+def test_hash_round_trip():
+    hasher = PasswordHasher(n=1024, workers=0)
+    stored = hasher.hash('secret')
+    assert stored.startswith('scrypt$1024$8$1$')
+    assert hasher.verify('secret', stored)
+    assert not hasher.verify('wrong', stored)
+    assert not hasher.needs_rehash(stored)
+
+
+def test_rehash_only_upgrades():
+    weak = PasswordHasher(n=1024, workers=0).hash('secret')
+    strong = PasswordHasher(n=4096, workers=0).hash('secret')
+    hasher = PasswordHasher(n=2048, workers=0)
+    assert hasher.needs_rehash(weak)
+    # A worker with a lower cost must not rewrite a stronger hash
+    assert not hasher.needs_rehash(strong)
+
+
+def test_legacy_hash_verifies_and_needs_rehash():
+    salt = 'abc'
+    legacy = hashlib.sha256(('secret' + salt).encode()).hexdigest() + ':' + salt
+    hasher = PasswordHasher(n=1024, workers=0)
+    assert hasher.verify('secret', legacy)
+    assert hasher.needs_rehash(legacy)
@@ -0,0 +1,25 @@
+import sqlite3
+import threading
+
+from auth.rate_limiter import RateLimiter
+
+
+def test_snapshots_survive_errors():
+    limiter = RateLimiter()
+    attempts = []
+    snapshotted = threading.Event()
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return sqlite3.connect(':memory:')
+
+    def snapshot(conn):
+        snapshotted.set()
+
+    limiter.snapshot = snapshot
+    limiter.start_snapshots(connect, 0.01)
+    # The first run fails; the thread keeps going and the next one succeeds
+    assert snapshotted.wait(timeout=5)
+    assert len(attempts) >= 2
@@ -0,0 +1,10 @@
+from database.reset_db import Generator
+
+
+def test_login_attempts_target_generated_users():
+    gen = Generator(seed=1)
+    emails = {row[1] for row in gen.users(200, 'hash')}
+    attempts = list(gen.login_attempts(2000))
+    known = [email for email, _, _, _ in attempts if email in emails]
+    # About 95% aim at real accounts, the rest at addresses that don't exist
+    assert 0.9 < len(known) / len(attempts) < 0.99
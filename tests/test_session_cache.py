@@ -0,0 +1,20 @@
+import time
+
+from database.db import Database
+
+
+def test_logout_reaches_other_workers_within_ttl(app_module):
+    # Two Database objects stand in for two workers sharing auth.db
+    worker_a = app_module.db
+    worker_b = Database()
+    assert worker_b.session_cache.ttl <= 5
+    worker_b.session_cache.ttl = 0.05
+
+    token = worker_a.create_session(4242)
+    assert worker_b.validate_session(token) == 4242
+    assert worker_b.session_cache.stats()['size'] == 1
+
+    worker_a.invalidate_session(token)
+    assert worker_a.validate_session(token) is None
+    time.sleep(0.1)
+    assert worker_b.validate_session(token) is None
@@ -0,0 +1,28 @@
+import time
+
+from database import tracing
+from database.slow_query_log import SlowQueryLog
+
+
+def test_query_slow_only_while_fetching_is_logged():
+    conn = tracing.connect(':memory:')
+    conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+    conn.executemany('INSERT INTO items (name) VALUES (?)', [(f'item{i}',) for i in range(30)])
+    # Rows are computed as they are fetched, so execute() returns after the
+    # first row and the remaining sleeps all happen in fetchall()
+    conn.create_function('pause', 1, lambda x: time.sleep(0.005) or x)
+    log = SlowQueryLog(threshold_ms=60)
+    log.enable()
+    try:
+        cursor = conn.execute('SELECT pause(name) FROM items WHERE name LIKE ?', ('item%',))
+        assert log.slow == 0
+        assert len(cursor.fetchall()) == 30
+    finally:
+        log.disable()
+        conn.close()
+
+    [entry] = log.recent()
+    assert entry['sql'] == 'SELECT pause(name) FROM items WHERE name LIKE ?'
+    assert entry['duration_ms'] >= 100
+    assert entry['parameters'] == ['str(5)']
+    assert entry['full_scan']
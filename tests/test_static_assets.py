@@ -0,0 +1,41 @@
+import pytest
+from flask import Flask
+
+from web.static_assets import StaticAssets, precompress
+
+
+@pytest.fixture
+def dist(tmp_path):
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'assets' / 'app-0123456789.js').write_text('console.log("hello");\n' * 100)
+    (tmp_path / 'index.html').write_text('<html></html>')
+    return tmp_path
+
+
+def serve(assets, path, **headers):
+    app = Flask(__name__)
+    with app.test_request_context(headers=headers):
+        return assets.response(assets.lookup(path))
+
+
+def test_nothing_is_compressed_at_startup(dist):
+    assets = StaticAssets(str(dist))
+    assert assets.lookup('assets/app-0123456789.js').variants == {}
+    assert not list(dist.rglob('*.gz'))
+
+
+def test_prebuilt_variants_get_their_own_etag(dist):
+    assert precompress(str(dist)) >= 1
+    assets = StaticAssets(str(dist))
+    path = 'assets/app-0123456789.js'
+
+    identity = serve(assets, path, **{'Accept-Encoding': 'identity'})
+    gzipped = serve(assets, path, **{'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in identity.headers
+    assert gzipped.headers['ETag'] != identity.headers['ETag']
+
+    # A cached gzip body only revalidates for a client that gets gzip
+    etag = gzipped.headers['ETag']
+    assert serve(assets, path, **{'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 304
+    assert serve(assets, path, **{'Accept-Encoding': 'identity', 'If-None-Match': etag}).status_code == 200
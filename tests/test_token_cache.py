@@ -0,0 +1,45 @@
+import secrets
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+
+from auth.token_cache import TokenCache, TokenRevoked
+
+SECRET = 'test-secret'
+
+
+def admin_token():
+    claims = {'role': 'admin', 'jti': secrets.token_hex(8), 'exp': datetime.utcnow() + timedelta(hours=1)}
+    return jwt.encode(claims, SECRET)
+
+
+def test_revocation_reaches_other_workers(app_module):
+    # Two workers' caches sharing auth.db
+    first = TokenCache(SECRET, revocations=app_module.db, check_interval=0)
+    second = TokenCache(SECRET, revocations=app_module.db, check_interval=0)
+    token = admin_token()
+    assert second.verify(token)['role'] == 'admin'
+
+    first.revoke(token, jwt.decode(token, SECRET, algorithms=['HS256'])['exp'])
+    with pytest.raises(TokenRevoked):
+        second.verify(token)
+
+
+def test_cached_claims_are_rechecked_after_interval(app_module):
+    cache = TokenCache(SECRET, revocations=app_module.db, check_interval=3600)
+    token = admin_token()
+    cache.verify(token)
+    app_module.db.revoke_token(TokenCache.digest(token))
+    # Within the interval the cached entry is trusted
+    assert cache.verify(token)['role'] == 'admin'
+    cache.check_interval = 0
+    with pytest.raises(TokenRevoked):
+        cache.verify(token)
+
+
+def test_logout_endpoint_revokes_for_every_worker(app_module, client, admin_headers):
+    assert client.post('/api/admin/logout', headers=admin_headers).status_code == 200
+    other_worker = TokenCache(app_module.token_cache.secret, revocations=app_module.db)
+    with pytest.raises(TokenRevoked):
+        other_worker.verify(admin_headers['Authorization'].split(' ')[1])
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from database import tracing
+
+# Each row sleeps, so almost all of the query's cost is in reading its rows
+SLOW_ROWS = '''
+    WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 20)
+    SELECT pause(x) FROM n
+'''
+
+
+@pytest.fixture
+def traced():
+    seen = []
+
+    def listener(conn, sql, parameters, seconds):
+        seen.append((sql, seconds))
+
+    conn = tracing.connect(':memory:')
+    conn.create_function('pause', 1, lambda x: time.sleep(0.005) or x)
+    tracing.add_listener(listener)
+    yield conn, seen
+    tracing.remove_listener(listener)
+    conn.close()
+
+
+def test_fetchall_time_is_counted(traced):
+    conn, seen = traced
+    cursor = conn.execute(SLOW_ROWS)
+    assert seen == []
+    assert len(cursor.fetchall()) == 20
+    [(sql, seconds)] = seen
+    assert sql == SLOW_ROWS
+    assert seconds >= 0.09
+
+
+def test_iteration_and_fetchmany_are_counted(traced):
+    conn, seen = traced
+    assert len(list(conn.execute(SLOW_ROWS))) == 20
+    cursor = conn.execute(SLOW_ROWS)
+    while cursor.fetchmany(6):
+        pass
+    assert [sql for sql, _ in seen] == [SLOW_ROWS, SLOW_ROWS]
+    assert all(seconds >= 0.09 for _, seconds in seen)
+
+
+def test_partially_read_cursor_reports_when_dropped(traced):
+    conn, seen = traced
+    cursor = conn.execute(SLOW_ROWS)
+    cursor.fetchone()
+    assert seen == []
+    del cursor
+    assert len(seen) == 1
+
+
+def test_statements_without_rows_report_immediately(traced):
+    conn, seen = traced
+    conn.execute('CREATE TABLE t (a)')
+    conn.executemany('INSERT INTO t VALUES (?)', [(1,), (2,)])
+    assert [sql for sql, _ in seen] == ['CREATE TABLE t (a)', 'INSERT INTO t VALUES (?)']
@@ -9,4 +9,7 @@ npm run vercel-build
 
 # Install backend dependencies
 cd ..
-pip install -r requirements.txt 
\ No newline at end of file
+pip install -r requirements.txt
+
+# Precompress the built assets once, rather than in every worker
+python -m web.static_assets frontend/dist 
\ No newline at end of file
@@ -0,0 +1,89 @@
+import gzip
+import threading
+
+from flask import request
+
+from web.static_assets import COMPRESSIBLE_TYPES
+
+try:
+    import brotli
+except ImportError:  # optional; without it responses are only gzipped
+    brotli = None
+
+
+class Compression:
+    """Compress dynamic responses according to Accept-Encoding.
+
+    init_app() registers an after_request hook that brotli- (if installed)
+    or gzip-encodes buffered responses of a compressible type once they
+    reach min_size bytes. Streamed and passthrough (file) responses, and
+    responses that already carry a Content-Encoding, such as pre-compressed
+    static assets, are left alone. Levels favour speed over ratio, since
+    the work is repeated for every request.
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._lock = threading.Lock()
+        self.responses = {'br': 0, 'gzip': 0}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def init_app(self, app):
+        app.after_request(self._after_request)
+
+    def encoding(self):
+        """The best encoding the client accepts, or None"""
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def _after_request(self, response):
+        if (response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.encoding()
+        if encoding is None:
+            return response
+        compressed = self.compress(data, encoding)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if response.get_etag()[0]:
+            # The compressed body is a different representation
+            response.headers['ETag'] = response.headers['ETag'].rstrip('"') + f'-{encoding}"'
+        with self._lock:
+            self.responses[encoding] += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(compressed)
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                'min_size': self.min_size,
+                'brotli_available': brotli is not None,
+                'responses': dict(self.responses),
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            }
@@ -0,0 +1,123 @@
+import logging
+import os
+
+from flask import request, send_file
+
+logger = logging.getLogger(__name__)
+
+
+class FileDelivery:
+    """Send downloadable files with conditional and range request support.
+
+    By default files are sent by Werkzeug, which answers If-None-Match,
+    If-Modified-Since, Range and If-Range. Full responses advertise
+    Accept-Ranges so clients know they can resume.
+
+    With offload='nginx' the response carries only an X-Accel-Redirect
+    header pointing at ``offload_prefix`` + the path relative to ``root``,
+    and nginx streams the bytes itself; offload='apache' does the same with
+    X-Sendfile and the absolute path. Paths that resolve outside ``root``
+    are refused. Full responses are left as the server's file wrapper, so
+    they can go out through sendfile, and are logged with their
+    Content-Length. Range responses are already a Python iterator, so their
+    bytes are counted as they are sent and logged when the body is closed;
+    aborted ranges show as incomplete.
+    """
+
+    def __init__(self, root='.', offload=None, offload_prefix='/protected/', max_age=3600):
+        self.root = os.path.realpath(root)
+        self.offload = offload
+        self.offload_prefix = offload_prefix
+        self.max_age = max_age
+
+    def resolve(self, path):
+        """Absolute path of a file under root, or None if it is missing or outside root"""
+        full_path = os.path.realpath(os.path.join(self.root, path))
+        if os.path.commonpath([self.root, full_path]) != self.root:
+            logger.warning("Refusing download of %s: outside %s", path, self.root)
+            return None
+        if not os.path.isfile(full_path):
+            return None
+        return full_path
+
+    def send(self, path, mimetype, download_name=None):
+        """Return a response for path, or None if there is no such file under root"""
+        full_path = self.resolve(path)
+        if full_path is None:
+            return None
+        download_name = download_name or os.path.basename(full_path)
+
+        response = send_file(
+            full_path,
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=download_name,
+            conditional=self.offload not in ('nginx', 'apache'),
+            etag=True,
+            max_age=self.max_age
+        )
+
+        if self.offload in ('nginx', 'apache'):
+            # Keep send_file's headers, including its Content-Disposition
+            # quoting, but let the server send the body
+            response.close()
+            response.response = []
+            del response.headers['Content-Length']
+            if self.offload == 'nginx':
+                relative = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                response.headers['X-Accel-Redirect'] = self.offload_prefix.rstrip('/') + '/' + relative
+            else:
+                response.headers['X-Sendfile'] = full_path
+            logger.info("Download %s offloaded to %s for %s", path, self.offload, request.remote_addr)
+            return response
+
+        if response.status_code == 200:
+            response.headers['Accept-Ranges'] = 'bytes'
+        self._log_on_close(response, path)
+        return response
+
+    @staticmethod
+    def _log_on_close(response, path):
+        """Log the download, once the body is closed for range responses"""
+        status = response.status_code
+        expected = 0 if request.method == 'HEAD' else response.content_length or 0
+        range_header = request.headers.get('Range')
+        client = request.remote_addr
+
+        def log(sent):
+            logger.info(
+                "Download %s status=%s bytes=%s/%s complete=%s range=%s client=%s",
+                path, status, sent, expected, sent == expected, range_header, client
+            )
+
+        if status == 206:
+            # send_file sets direct_passthrough, so the server closes this
+            # body itself rather than calling response.close()
+            response.response = _CountingBody(response.response, log)
+        else:
+            log(expected)
+
+
+class _CountingBody:
+    """Response iterable that counts the bytes handed to the server.
+
+    close() always closes the wrapped body, even if it was never iterated,
+    then passes the count to on_close.
+    """
+
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+        self.sent = 0
+
+    def __iter__(self):
+        for chunk in self.body:
+            self.sent += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            self.on_close(self.sent)
@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+
+from flask.json import JSONEncoder
+
+from database.models import Model, json_default
+
+try:
+    import orjson
+except ImportError:  # optional; without it the stdlib encoder is used
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Dates, datetimes and dataclasses go through JSONEncoder.default so output
+# matches Flask's encoder; orjson would format them differently
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def select_backend(name=None):
+    """'orjson' when requested (the default) and installed, otherwise 'stdlib'"""
+    name = (name or os.getenv('JSON_ENCODER', 'orjson')).lower()
+    if name not in ('orjson', 'stdlib'):
+        raise ValueError(f"JSON_ENCODER must be 'orjson' or 'stdlib', not '{name}'")
+    if name == 'orjson' and orjson is None:
+        logger.info("orjson is not installed; using the stdlib JSON encoder")
+        return 'stdlib'
+    return name
+
+
+BACKEND = select_backend()
+
+
+def dumps(value, default=json_default):
+    """Compact JSON bytes, through orjson when it is the selected backend"""
+    if BACKEND == 'orjson':
+        try:
+            return orjson.dumps(value, default=default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:  # e.g. integers wider than 64 bits
+            pass
+    return json.dumps(value, default=default, separators=(',', ':')).encode()
+
+
+class FastJSONEncoder(JSONEncoder):
+    """Flask's JSONEncoder, serializing through orjson when it is the backend.
+
+    Set as app.json_encoder, so jsonify() and every other Flask JSON call
+    use it. Indented output (JSONIFY_PRETTYPRINT_REGULAR, debug mode) and
+    values orjson rejects fall back to the stdlib path. orjson writes
+    non-ASCII characters as UTF-8 rather than \\u escapes; both are valid JSON.
+    Row models are converted to dicts here, as they are serialized.
+    """
+
+    def default(self, o):
+        if isinstance(o, Model):
+            return o.to_dict()
+        return super().default(o)
+
+    def encode(self, o):
+        if BACKEND != 'orjson' or self.indent is not None:
+            return super().encode(o)
+        option = ORJSON_OPTIONS | orjson.OPT_SORT_KEYS if self.sort_keys else ORJSON_OPTIONS
+        try:
+            return orjson.dumps(o, default=self.default, option=option).decode()
+        except orjson.JSONEncodeError:
+            return super().encode(o)
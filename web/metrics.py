@@ -0,0 +1,163 @@
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+
+from database import tracing
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.label_names, labels)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label combination"""
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count))
+                            for labels, (counts, total, count) in self._series.items())
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {count}')
+        return lines
+
+
+class Metrics:
+    """Request, database and collector metrics in Prometheus text format.
+
+    init_app() times every request between before_request and
+    after_request and labels it by method, URL rule (not the raw path, so
+    ids don't explode the series count) and status. SQL run while handling
+    a request is counted through database.tracing. Collectors registered
+    with add_collector() are read at scrape time, so components that
+    already keep their own counters cost nothing per event.
+    """
+
+    def __init__(self):
+        self.request_seconds = Histogram(
+            'http_request_duration_seconds', 'Time to build the response, by route and status',
+            ('method', 'route', 'status'))
+        self.request_queries = Histogram(
+            'http_request_db_queries', 'SQL statements run per request',
+            ('route',), QUERY_COUNT_BUCKETS)
+        self.request_db_seconds = Histogram(
+            'http_request_db_seconds', 'Time spent executing and fetching SQL per request', ('route',))
+        self.db_queries = Counter('db_queries_total', 'SQL statements executed', ('db',))
+        self.db_seconds = Counter('db_query_seconds_total', 'Time spent executing and fetching SQL', ('db',))
+        self._collectors = []
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        tracing.add_listener(self._on_query)
+
+    def add_collector(self, collector):
+        """collector() returns (name, type, description, [(labels_dict, value), ...]) tuples"""
+        self._collectors.append(collector)
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        # [statements, seconds], filled in by _on_query
+        g.db_cost = [0, 0.0]
+
+    def _after_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        self.request_seconds.observe(time.perf_counter() - started, request.method, route, str(response.status_code))
+        queries, seconds = g.pop('db_cost', (0, 0.0))
+        self.request_queries.observe(queries, route)
+        self.request_db_seconds.observe(seconds, route)
+        return response
+
+    def _on_query(self, conn, sql, parameters, seconds):
+        label = conn.label or 'sqlite'
+        self.db_queries.inc(1, label)
+        self.db_seconds.inc(seconds, label)
+        if has_request_context():
+            cost = g.get('db_cost')
+            if cost is not None:
+                cost[0] += 1
+                cost[1] += seconds
+
+    def render(self):
+        lines = []
+        for metric in (self.request_seconds, self.request_queries, self.request_db_seconds,
+                       self.db_queries, self.db_seconds):
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, description, samples in collector():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_labels(labels.keys(), labels.values())} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def response(self):
+        return Response(self.render(), content_type=PROMETHEUS_CONTENT_TYPE)
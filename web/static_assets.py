@@ -0,0 +1,164 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+
+from flask import Response, request, send_file
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip variants are built
+    brotli = None
+
+# Vite emits build assets as assets/name-<hash>.ext; their content never changes
+HASHED_ASSET_RE = re.compile(r'^assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/javascript', 'application/json', 'application/xml',
+    'image/svg+xml', 'application/wasm', 'application/manifest+json',
+)
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+# Precompressed files written next to each asset by precompress()
+VARIANT_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _compressible(mimetype, size, min_size):
+    return size >= min_size and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def precompress(root, min_size=512):
+    """Write .gz (and .br, if brotli is installed) files next to compressible assets.
+
+    Run once per frontend build, not per worker: maximum compression levels
+    are slow. Variants no smaller than the original are not written.
+    Returns the number of files written.
+    """
+    written = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.endswith(('.gz', '.br')):
+                continue
+            path = os.path.join(directory, name)
+            mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            if not _compressible(mimetype, os.path.getsize(path), min_size):
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data, quality=11)
+            for suffix, compressed in variants.items():
+                if len(compressed) < len(data):
+                    with open(path + suffix, 'wb') as f:
+                        f.write(compressed)
+                    written += 1
+    return written
+
+
+class Asset:
+    __slots__ = ('path', 'mimetype', 'size', 'etag', 'cache_control', 'body', 'variants')
+
+    def __init__(self, path, mimetype, size, etag, cache_control, body=None, variants=None):
+        self.path = path
+        self.mimetype = mimetype
+        self.size = size
+        self.etag = etag
+        self.cache_control = cache_control
+        self.body = body
+        self.variants = variants or {}
+
+
+class StaticAssets:
+    """In-memory manifest of the built frontend, scanned once at startup.
+
+    Every file gets a content-hash ETag, and each encoded variant its own
+    ETag with the encoding appended. Files up to max_inline_bytes are held
+    in memory together with the .br and .gz variants precompress() wrote at
+    build time, so requests, including 304 revalidations, never touch the
+    filesystem. Nothing is compressed here. Larger files are streamed from
+    disk.
+    """
+
+    def __init__(self, root, max_inline_bytes=1024 * 1024, min_compress_bytes=512):
+        self.root = root
+        self.max_inline_bytes = max_inline_bytes
+        self.min_compress_bytes = min_compress_bytes
+        self.assets = {}
+        self.build()
+
+    def build(self):
+        assets = {}
+        if os.path.isdir(self.root):
+            for directory, _, files in os.walk(self.root):
+                for name in files:
+                    if name.endswith(('.gz', '.br')):
+                        continue
+                    path = os.path.join(directory, name)
+                    rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+                    assets[rel] = self._load(rel, path)
+        self.assets = assets
+
+    def _load(self, rel, path):
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        cache_control = IMMUTABLE_CACHE if HASHED_ASSET_RE.search(rel) else REVALIDATE_CACHE
+        size = os.path.getsize(path)
+        digest = hashlib.sha256()
+
+        if size > self.max_inline_bytes:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            return Asset(path, mimetype, size, digest.hexdigest()[:32], cache_control)
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest.update(data)
+        etag = digest.hexdigest()[:32]
+
+        variants = {}
+        if _compressible(mimetype, size, self.min_compress_bytes):
+            modified = os.path.getmtime(path)
+            for encoding, suffix in VARIANT_SUFFIXES:
+                variant_path = path + suffix
+                # Skip variants left over from an older build of the file
+                if os.path.exists(variant_path) and os.path.getmtime(variant_path) >= modified:
+                    with open(variant_path, 'rb') as f:
+                        variants[encoding] = f.read()
+        return Asset(path, mimetype, size, etag, cache_control, data, variants)
+
+    def lookup(self, path):
+        return self.assets.get(path)
+
+    def response(self, asset):
+        """Build the response for asset, honouring If-None-Match and Accept-Encoding"""
+        encoding = None
+        for candidate, _ in VARIANT_SUFFIXES:
+            if candidate in asset.variants and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        # Each representation has its own ETag
+        etag = f'{asset.etag}-{encoding}' if encoding else asset.etag
+        headers = {'ETag': f'"{etag}"', 'Cache-Control': asset.cache_control}
+        if asset.variants:
+            headers['Vary'] = 'Accept-Encoding'
+
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+
+        if asset.body is None:
+            response = send_file(asset.path, mimetype=asset.mimetype, conditional=False, etag=False)
+            response.headers.extend(headers)
+            return response
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+            return Response(asset.variants[encoding], mimetype=asset.mimetype, headers=headers)
+        return Response(asset.body, mimetype=asset.mimetype, headers=headers)
+
+
+if __name__ == '__main__':
+    # Build step: python -m web.static_assets [frontend/dist]
+    root = sys.argv[1] if len(sys.argv) > 1 else os.path.join('frontend', 'dist')
+    print(f'Wrote {precompress(root)} precompressed files under {root}')